@@ -3,51 +3,86 @@
 Script to add PRODUCT_TYPE column to highlights CSV files
 """
 
-import pandas as pd
+import glob
 import os
-import re
+import sys
+from multiprocessing import Pool
 from pathlib import Path
 
-def add_product_type_column(file_path):
-    """Add PRODUCT_TYPE column to a highlights CSV file"""
+from src.utils.highlights_csv import HIGHLIGHTS_RE, insert_product_type_column
+
+def insert_product_type(file_path):
+    """
+    Insert PRODUCT_TYPE after Date in a highlights CSV file.
+    
+    Does not print, so it can run inside a worker process.
+    Returns a (file_path, status, detail) tuple where status is
+    'updated', 'skipped' or 'error'.
+    """
     
     # Extract product type from filename
     filename = os.path.basename(file_path)
-    match = re.search(r'highlights_\d{8}_(WB|DBIB)\.csv', filename)
+    match = HIGHLIGHTS_RE.search(filename)
     if not match:
-        print(f"Could not extract product type from filename: {filename}")
-        return False
+        return file_path, 'error', "Could not extract product type from filename"
     
     product_type = match.group(1)
-    print(f"Processing {filename} -> Product Type: {product_type}")
     
-    # Read the CSV file
+    # Stream the rows into a temp file, then swap it in; blank lines are dropped and a
+    # malformed record (an unclosed quote, extra fields) leaves the file as it was
     try:
-        df = pd.read_csv(file_path)
-        print(f"Original columns: {list(df.columns)}")
-        
-        # Insert PRODUCT_TYPE column after Date column
-        if 'Date' in df.columns:
-            # Get the index of the Date column
-            date_idx = df.columns.get_loc('Date')
-            
-            # Insert PRODUCT_TYPE column right after Date
-            df.insert(date_idx + 1, 'PRODUCT_TYPE', product_type)
-            
-            print(f"New columns: {list(df.columns)}")
-            
-            # Save the modified file
-            df.to_csv(file_path, index=False)
-            print(f"✅ Successfully added PRODUCT_TYPE column to {filename}")
-            return True
-        else:
-            print(f"❌ No 'Date' column found in {filename}")
-            return False
-            
+        status = insert_product_type_column(file_path, product_type)
     except Exception as e:
-        print(f"❌ Error processing {filename}: {e}")
+        return file_path, 'error', str(e)
+    
+    if status == 'skipped':
+        return file_path, 'skipped', "already has PRODUCT_TYPE column"
+    if status == 'no_date':
+        return file_path, 'error', "No 'Date' column found"
+    return file_path, 'updated', product_type
+
+def add_product_type_column(file_path):
+    """Add PRODUCT_TYPE column to a highlights CSV file"""
+    
+    filename = os.path.basename(file_path)
+    print(f"Processing {filename}")
+    
+    _, status, detail = insert_product_type(file_path)
+    if status == 'updated':
+        print(f"✅ Successfully added PRODUCT_TYPE column ({detail}) to {filename}")
+        return True
+    elif status == 'skipped':
+        print(f"⏭️  {filename} {detail}, skipping...")
+        return True
+    else:
+        print(f"❌ Error processing {filename}: {detail}")
         return False
 
+def process_directory(folder):
+    """Add PRODUCT_TYPE to every highlights file in a folder using a process pool"""
+    
+    paths = []
+    for product in ("WB", "DBIB"):
+        paths.extend(glob.glob(os.path.join(folder, f"highlights_*_{product}.csv")))
+    
+    print(f"Found {len(paths)} highlights files to process")
+    print("=" * 50)
+    
+    counts = {'updated': 0, 'skipped': 0, 'error': 0}
+    with Pool(os.cpu_count()) as pool:
+        for file_path, status, detail in pool.imap_unordered(insert_product_type, sorted(paths), chunksize=8):
+            counts[status] += 1
+            if status == 'error':
+                print(f"❌ Error processing {os.path.basename(file_path)}: {detail}")
+    
+    print("=" * 50)
+    print(f"📊 Processing Summary:")
+    print(f"   ✅ Successfully processed: {counts['updated']}")
+    print(f"   ⏭️  Skipped (already processed): {counts['skipped']}")
+    print(f"   ❌ Errors: {counts['error']}")
+    print(f"   📁 Total files: {len(paths)}")
+    return counts
+
 def test_single_file():
     """Test the function on a single file"""
     test_file = "data/correct/highlights_20230901_DBIB.csv"
@@ -63,4 +98,7 @@ def test_single_file():
         print(f"❌ Test file not found: {test_file}")
 
 if __name__ == "__main__":
-    test_single_file() 
\ No newline at end of file
+    if len(sys.argv) > 1:
+        process_directory(sys.argv[1])
+    else:
+        test_single_file()
@@ -3,17 +3,26 @@
 Script to check and align dates and product types between highlights and table files
 """
 
+import logging
+import sys
 import pandas as pd
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Filename patterns, compiled once for batch runs
+_HIGHLIGHTS_RE = re.compile(r'highlights_(\d{8})_(WB|DBIB)\.csv')
+_TABLE_RE = re.compile(r'table_.*?(\d{4}_\d{2}_\d{2})\.csv')
+
 def extract_date_and_product_from_filename(filename):
     """Extract date and product type from filename"""
     
     # Pattern for highlights files: highlights_YYYYMMDD_PRODUCT.csv
-    highlights_match = re.search(r'highlights_(\d{8})_(WB|DBIB)\.csv', filename)
+    highlights_match = _HIGHLIGHTS_RE.search(filename)
     if highlights_match:
         date_str = highlights_match.group(1)
         product = highlights_match.group(2)
@@ -22,7 +31,7 @@ def extract_date_and_product_from_filename(filename):
         return date_formatted, product, "highlights"
     
     # Pattern for table files: table_*_YYYY_MM_DD.csv
-    table_match = re.search(r'table_.*?(\d{4}_\d{2}_\d{2})\.csv', filename)
+    table_match = _TABLE_RE.search(filename)
     if table_match:
         date_str = table_match.group(1)
         # Extract product type from the filename content
@@ -54,38 +63,38 @@ def check_and_fix_file(file_path):
     """Check and fix date/product alignment in a single file"""
     
     filename = os.path.basename(file_path)
-    print(f"\n🔍 Checking: {filename}")
+    logger.debug(f"\n🔍 Checking: {filename}")
     
     # Extract date and product from filename
     filename_date, filename_product, file_type = extract_date_and_product_from_filename(filename)
     
     if not filename_date or not filename_product:
-        print(f"❌ Could not extract date/product from filename: {filename}")
+        logger.error(f"❌ Could not extract date/product from filename: {filename}")
         return False
     
-    print(f"   📅 Filename date: {filename_date}")
-    print(f"   🏷️  Filename product: {filename_product}")
+    logger.debug(f"   📅 Filename date: {filename_date}")
+    logger.debug(f"   🏷️  Filename product: {filename_product}")
     
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
+        # Read only the header and first row; the full file is loaded only when a fix is needed
+        df = pd.read_csv(file_path, nrows=1)
         
         if file_type == "highlights":
             # Check highlights file
             if 'Date' not in df.columns:
-                print(f"❌ No 'Date' column found in highlights file")
+                logger.error(f"❌ No 'Date' column found in highlights file: {filename}")
                 return False
             
             if 'PRODUCT_TYPE' not in df.columns:
-                print(f"❌ No 'PRODUCT_TYPE' column found in highlights file")
+                logger.error(f"❌ No 'PRODUCT_TYPE' column found in highlights file: {filename}")
                 return False
             
             # Get the actual values from the file
             actual_date = str(df.iloc[0]['Date']) if len(df) > 0 else None
             actual_product = df.iloc[0]['PRODUCT_TYPE'] if len(df) > 0 else None
             
-            print(f"   📅 Content date: {actual_date}")
-            print(f"   🏷️  Content product: {actual_product}")
+            logger.debug(f"   📅 Content date: {actual_date}")
+            logger.debug(f"   🏷️  Content product: {actual_product}")
             
             # Convert filename date to YYYYMMDD for comparison
             filename_date_compact = convert_date_format(filename_date, "YYYY_MM_DD", "YYYYMMDD")
@@ -95,44 +104,57 @@ def check_and_fix_file(file_path):
             
             # Check date alignment
             if actual_date != filename_date_compact:
-                print(f"   ⚠️  Date mismatch: filename={filename_date_compact}, content={actual_date}")
+                logger.debug(f"   ⚠️  Date mismatch: filename={filename_date_compact}, content={actual_date}")
                 needs_fix = True
                 fixes.append(f"Update content date from {actual_date} to {filename_date_compact}")
             
             # Check product alignment
             if actual_product != filename_product:
-                print(f"   ⚠️  Product mismatch: filename={filename_product}, content={actual_product}")
+                logger.debug(f"   ⚠️  Product mismatch: filename={filename_product}, content={actual_product}")
                 needs_fix = True
                 fixes.append(f"Update content product from {actual_product} to {filename_product}")
             
             if needs_fix:
-                print(f"   🔧 Applying fixes...")
+                logger.debug(f"   🔧 Applying fixes...")
+                df = pd.read_csv(file_path)
                 if len(df) > 0:
-                    df.iloc[0, df.columns.get_loc('Date')] = filename_date_compact
-                    df.iloc[0, df.columns.get_loc('PRODUCT_TYPE')] = filename_product
+                    date_col = df.columns.get_loc('Date')
+                    product_col = df.columns.get_loc('PRODUCT_TYPE')
+                    # Match the Date column dtype so pandas doesn't upcast it; a Date
+                    # column with empty cells is read as float64
+                    if pd.api.types.is_integer_dtype(df['Date']):
+                        df.iat[0, date_col] = int(filename_date_compact)
+                    elif pd.api.types.is_float_dtype(df['Date']):
+                        df.iat[0, date_col] = float(filename_date_compact)
+                    else:
+                        df.iat[0, date_col] = filename_date_compact
+                    # An all-empty PRODUCT_TYPE column is read as float64 and cannot hold text
+                    if not pd.api.types.is_string_dtype(df['PRODUCT_TYPE']):
+                        df['PRODUCT_TYPE'] = df['PRODUCT_TYPE'].astype(object)
+                    df.iat[0, product_col] = filename_product
                     df.to_csv(file_path, index=False)
-                    print(f"   ✅ Fixed: {', '.join(fixes)}")
+                    logger.info(f"   ✅ Fixed {filename}: {', '.join(fixes)}")
                 return True
             else:
-                print(f"   ✅ File is already aligned")
+                logger.debug(f"   ✅ File is already aligned")
                 return True
                 
         elif file_type == "table":
             # Check table file
             if 'VALUATION_DATE' not in df.columns:
-                print(f"❌ No 'VALUATION_DATE' column found in table file")
+                logger.error(f"❌ No 'VALUATION_DATE' column found in table file: {filename}")
                 return False
             
             if 'PRODUCT_TYPE' not in df.columns:
-                print(f"❌ No 'PRODUCT_TYPE' column found in table file")
+                logger.error(f"❌ No 'PRODUCT_TYPE' column found in table file: {filename}")
                 return False
             
             # Get the actual values from the file (check first row)
             actual_date = str(df.iloc[0]['VALUATION_DATE']) if len(df) > 0 else None
             actual_product = df.iloc[0]['PRODUCT_TYPE'] if len(df) > 0 else None
             
-            print(f"   📅 Content date: {actual_date}")
-            print(f"   🏷️  Content product: {actual_product}")
+            logger.debug(f"   📅 Content date: {actual_date}")
+            logger.debug(f"   🏷️  Content product: {actual_product}")
             
             # Convert filename date to YYYYMMDD for comparison
             filename_date_compact = convert_date_format(filename_date, "YYYY_MM_DD", "YYYYMMDD")
@@ -142,53 +164,55 @@ def check_and_fix_file(file_path):
             
             # Check date alignment
             if actual_date != filename_date_compact:
-                print(f"   ⚠️  Date mismatch: filename={filename_date_compact}, content={actual_date}")
+                logger.debug(f"   ⚠️  Date mismatch: filename={filename_date_compact}, content={actual_date}")
                 needs_fix = True
                 fixes.append(f"Update content date from {actual_date} to {filename_date_compact}")
             
             # Check product alignment
             if actual_product != filename_product:
-                print(f"   ⚠️  Product mismatch: filename={filename_product}, content={actual_product}")
+                logger.debug(f"   ⚠️  Product mismatch: filename={filename_product}, content={actual_product}")
                 needs_fix = True
                 fixes.append(f"Update content product from {actual_product} to {filename_product}")
             
             if needs_fix:
-                print(f"   🔧 Applying fixes...")
+                logger.debug(f"   🔧 Applying fixes...")
+                df = pd.read_csv(file_path)
                 if len(df) > 0:
                     # Update all rows with the correct date and product
-                    df['VALUATION_DATE'] = filename_date_compact
+                    df['VALUATION_DATE'] = int(filename_date_compact)
                     df['PRODUCT_TYPE'] = filename_product
                     df.to_csv(file_path, index=False)
-                    print(f"   ✅ Fixed: {', '.join(fixes)}")
+                    logger.info(f"   ✅ Fixed {filename}: {', '.join(fixes)}")
                 return True
             else:
-                print(f"   ✅ File is already aligned")
+                logger.debug(f"   ✅ File is already aligned")
                 return True
         
     except Exception as e:
-        print(f"❌ Error processing {filename}: {e}")
+        logger.error(f"❌ Error processing {filename}: {e}")
         return False
 
 def process_all_files():
     """Process all highlights and table files in the correct folder"""
     
     correct_folder = "data/correct"
-    all_files = []
     
-    # Find all CSV files
-    for file in os.listdir(correct_folder):
-        if file.endswith(".csv"):
-            all_files.append(os.path.join(correct_folder, file))
+    # Find all CSV files (DirEntry carries the file type, so no extra stat per entry)
+    with os.scandir(correct_folder) as entries:
+        all_files = [entry.path for entry in entries if entry.is_file() and entry.name.endswith(".csv")]
     
-    print(f"Found {len(all_files)} CSV files to check")
-    print("=" * 60)
+    logger.info(f"Found {len(all_files)} CSV files to check")
+    logger.info("=" * 60)
     
     success_count = 0
     error_count = 0
     fixed_count = 0
     
-    for file_path in sorted(all_files):
-        result = check_and_fix_file(file_path)
+    # Files are independent and the work is mostly file I/O, so check them on a thread pool
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(check_and_fix_file, sorted(all_files)))
+    
+    for result in results:
         if result:
             success_count += 1
             if "Fixed:" in str(result):
@@ -196,12 +220,13 @@ def process_all_files():
         else:
             error_count += 1
     
-    print("=" * 60)
-    print(f"📊 Processing Summary:")
-    print(f"   ✅ Successfully processed: {success_count}")
-    print(f"   🔧 Files fixed: {fixed_count}")
-    print(f"   ❌ Errors: {error_count}")
-    print(f"   📁 Total files: {len(all_files)}")
+    logger.info("=" * 60)
+    logger.info(f"📊 Processing Summary:")
+    logger.info(f"   ✅ Successfully processed: {success_count}")
+    logger.info(f"   🔧 Files fixed: {fixed_count}")
+    logger.info(f"   ❌ Errors: {error_count}")
+    logger.info(f"   📁 Total files: {len(all_files)}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     process_all_files() 
\ No newline at end of file
@@ -4,11 +4,16 @@ Concatenation utility for highlights data.
 Concatenates all highlights CSV files in the output directory and sorts by date.
 """
 
+import logging
+import sys
 import os
+import numpy as np
 import pandas as pd
 import glob
 from src.utils.config_manager import ConfigManager
 
+logger = logging.getLogger(__name__)
+
 def concatenate_highlights():
     """
     Concatenate all highlights CSV files into a single file, sorted by date.
@@ -18,41 +23,43 @@ def concatenate_highlights():
     output_dir = config_manager.get_output_dir()
     output_file = "combined_all_highlights.csv"
     
-    print("🔄 Starting highlights CSV concatenation process...")
-    print("=" * 60)
+    logger.info("🔄 Starting highlights CSV concatenation process...")
+    logger.info("=" * 60)
     
     # Step 1: Discover highlights CSV files
     csv_pattern = os.path.join(output_dir, "highlights_*.csv")
     highlights_files = glob.glob(csv_pattern)
     
     if not highlights_files:
-        print("❌ No highlights CSV files found in output directory!")
+        logger.error("❌ No highlights CSV files found in output directory!")
         return
     
-    print(f"📁 Found {len(highlights_files)} highlights CSV files:")
-    for file in sorted(highlights_files):
-        print(f"  - {os.path.basename(file)}")
-    print()
+    logger.info(f"📁 Found {len(highlights_files)} highlights CSV files:")
+    files = sorted(highlights_files)
+    basenames = [os.path.basename(p) for p in files]
+    for name in basenames:
+        logger.debug(f"  - {name}")
+    logger.info("")
     
     # Step 2: Read and concatenate highlights CSV files
     dataframes = []
     file_stats = []
     
-    for file_path in sorted(highlights_files):
+    for file_path, filename in zip(files, basenames):
         try:
-            print(f"📖 Reading: {os.path.basename(file_path)}")
+            logger.debug(f"📖 Reading: {filename}")
             df = pd.read_csv(file_path)
             
             # Show the columns for the first file to understand structure
             if not dataframes:
-                print(f"   📋 Columns found: {list(df.columns)}")
+                logger.debug(f"   📋 Columns found: {list(df.columns)}")
             
             # Validate expected columns (flexible structure)
             if 'Date' not in df.columns:
-                print(f"⚠️  Warning: {os.path.basename(file_path)} missing 'Date' column: {list(df.columns)}")
+                logger.warning(f"⚠️  Warning: {filename} missing 'Date' column: {list(df.columns)}")
             
             # Add source file information for tracking
-            df['SOURCE_FILE'] = os.path.basename(file_path)
+            df['SOURCE_FILE'] = filename
             
             dataframes.append(df)
             
@@ -62,78 +69,82 @@ def concatenate_highlights():
             else:
                 date_range = "No Date column"
             
+            rows = len(df)
             file_stats.append({
-                'file': os.path.basename(file_path),
-                'rows': len(df),
+                'file': filename,
+                'rows': rows,
                 'date_range': date_range
             })
             
-            print(f"   ✅ Loaded {len(df)} rows")
+            logger.debug(f"   ✅ Loaded {rows} rows")
             
         except Exception as e:
-            print(f"❌ Error reading {os.path.basename(file_path)}: {e}")
+            logger.error(f"❌ Error reading {filename}: {e}")
             continue
     
     if not dataframes:
-        print("❌ No valid highlights CSV files could be loaded!")
+        logger.error("❌ No valid highlights CSV files could be loaded!")
         return
     
-    print()
+    logger.info("")
     
     # Step 3: Concatenate all dataframes (preserving row order within each file)
-    print("🔗 Concatenating all highlights...")
+    logger.info("🔗 Concatenating all highlights...")
     combined_df = pd.concat(dataframes, ignore_index=True)
-    print(f"   ✅ Combined dataset has {len(combined_df)} total rows")
+    logger.info(f"   ✅ Combined dataset has {len(combined_df)} total rows")
     
     # Step 4: Sort by Date
     if 'Date' in combined_df.columns:
-        print("📅 Sorting by Date...")
+        logger.info("📅 Sorting by Date...")
         # Convert to numeric for proper sorting (in case it's stored as string)
         combined_df['Date'] = pd.to_numeric(combined_df['Date'], errors='coerce')
-        combined_df = combined_df.sort_values('Date')
-        combined_df = combined_df.reset_index(drop=True)
-        print(f"   ✅ Sorted by date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
+        # Stable argsort keeps row order within each date; take() reorders by position
+        order = np.argsort(combined_df['Date'].to_numpy(), kind='stable')
+        combined_df = combined_df.take(order).reset_index(drop=True)
+        date_min, date_max = combined_df['Date'].agg(['min', 'max'])
+        logger.info(f"   ✅ Sorted by date range: {date_min} - {date_max}")
     else:
-        print("⚠️  Date column not found - skipping date sorting")
+        logger.warning("⚠️  Date column not found - skipping date sorting")
     
     # Step 5: Save the combined file
     output_path = os.path.join(output_dir, output_file)
-    print(f"💾 Saving combined highlights to: {output_path}")
+    logger.info(f"💾 Saving combined highlights to: {output_path}")
     combined_df.to_csv(output_path, index=False)
     
     # Step 6: Display summary statistics
-    print()
-    print("📊 Highlights Summary Statistics:")
-    print("=" * 60)
-    print(f"Total files processed: {len(dataframes)}")
-    print(f"Total rows: {len(combined_df)}")
+    logger.info("")
+    logger.info("📊 Highlights Summary Statistics:")
+    logger.info("=" * 60)
+    logger.info(f"Total files processed: {len(dataframes)}")
+    logger.info(f"Total rows: {len(combined_df)}")
     
     if 'Date' in combined_df.columns:
-        print(f"Date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
-        print(f"Unique dates: {combined_df['Date'].nunique()}")
+        logger.info(f"Date range: {date_min} - {date_max}")
+        logger.info(f"Unique dates: {combined_df['Date'].nunique()}")
     
     # Show column structure
-    print(f"Columns: {list(combined_df.columns)}")
+    logger.info(f"Columns: {list(combined_df.columns)}")
     
     # Show highlights content summary
     if 'Daily Highlights' in combined_df.columns:
         non_empty_daily = combined_df[combined_df['Daily Highlights'].notna() & 
                                      (combined_df['Daily Highlights'].str.strip() != '')].shape[0]
-        print(f"Non-empty Daily Highlights: {non_empty_daily}")
+        logger.info(f"Non-empty Daily Highlights: {non_empty_daily}")
     
     if 'QTD Highlights' in combined_df.columns:
         non_empty_qtd = combined_df[combined_df['QTD Highlights'].notna() & 
                                    (combined_df['QTD Highlights'].str.strip() != '')].shape[0]
-        print(f"Non-empty QTD Highlights: {non_empty_qtd}")
+        logger.info(f"Non-empty QTD Highlights: {non_empty_qtd}")
     
-    print()
-    print("📋 File breakdown:")
+    logger.info("")
+    logger.info("📋 File breakdown:")
     for stat in file_stats:
-        print(f"  {stat['file']}: {stat['rows']} rows, dates {stat['date_range']}")
+        logger.info(f"  {stat['file']}: {stat['rows']} rows, dates {stat['date_range']}")
     
-    print()
-    print(f"✅ Successfully created: {output_path}")
-    print("🎉 Highlights concatenation completed!")
+    logger.info("")
+    logger.info(f"✅ Successfully created: {output_path}")
+    logger.info("🎉 Highlights concatenation completed!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     concatenate_highlights() 
\ No newline at end of file
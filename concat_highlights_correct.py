@@ -4,9 +4,18 @@ Concatenation utility for highlights data from data/correct folder.
 Concatenates all highlights CSV files in the data/correct directory and sorts by date.
 """
 
+import logging
+import sys
 import os
-import pandas as pd
 import glob
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from concat_tables_correct import coerce_date_column
+
+logger = logging.getLogger(__name__)
 
 def concatenate_highlights_correct():
     """
@@ -16,109 +25,125 @@ def concatenate_highlights_correct():
     output_dir = "data/correct"
     output_file = "combined_all_highlights.csv"
     
-    print("🔄 Starting highlights CSV concatenation process from data/correct...")
-    print("=" * 60)
+    logger.info("🔄 Starting highlights CSV concatenation process from data/correct...")
+    logger.info("=" * 60)
     
     # Step 1: Discover highlights CSV files
     csv_pattern = os.path.join(output_dir, "highlights_*.csv")
     highlights_files = glob.glob(csv_pattern)
     
     if not highlights_files:
-        print("❌ No highlights CSV files found in data/correct directory!")
+        logger.error("❌ No highlights CSV files found in data/correct directory!")
         return
     
-    print(f"📁 Found {len(highlights_files)} highlights CSV files:")
-    for file in sorted(highlights_files):
-        print(f"  - {os.path.basename(file)}")
-    print()
+    logger.info(f"📁 Found {len(highlights_files)} highlights CSV files:")
+    files = sorted(highlights_files)
+    basenames = [os.path.basename(p) for p in files]
+    for name in basenames:
+        logger.debug(f"  - {name}")
+    logger.info("")
     
-    # Step 2: Read and concatenate highlights CSV files
-    dataframes = []
+    # Step 2: Read highlights CSV files into Arrow tables
+    tables = []
+    source_files = []
     file_stats = []
+    read_options = pacsv.ReadOptions(block_size=8 << 20)
+    # Highlights cells contain quoted multi-line text
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    # Declare PRODUCT_TYPE up front; Date is left to inference because malformed files put text there
+    convert_options = pacsv.ConvertOptions(column_types={'PRODUCT_TYPE': pa.dictionary(pa.int32(), pa.string())})
     
-    for file_path in sorted(highlights_files):
+    for file_path, filename in zip(files, basenames):
         try:
-            print(f"📖 Reading: {os.path.basename(file_path)}")
-            df = pd.read_csv(file_path)
+            logger.debug(f"📖 Reading: {filename}")
+            table = pacsv.read_csv(file_path, read_options=read_options, parse_options=parse_options,
+                                   convert_options=convert_options)
             
             # Show the columns for the first file to understand structure
-            if not dataframes:
-                print(f"   📋 Columns found: {list(df.columns)}")
+            if not tables:
+                logger.debug(f"   📋 Columns found: {table.column_names}")
             
             # Validate expected columns (flexible structure)
-            if 'Date' not in df.columns:
-                print(f"⚠️  Warning: {os.path.basename(file_path)} missing 'Date' column: {list(df.columns)}")
+            if 'Date' not in table.column_names:
+                logger.warning(f"⚠️  Warning: {filename} missing 'Date' column: {table.column_names}")
             
-            # Add source file information for tracking
-            df['SOURCE_FILE'] = os.path.basename(file_path)
+            # Convert to numeric for proper sorting (in case it's stored as string)
+            if 'Date' in table.column_names:
+                table = coerce_date_column(table, 'Date')
             
-            dataframes.append(df)
+            tables.append(table)
+            source_files.append(filename)
             
             # Get date range info
-            if 'Date' in df.columns:
-                date_range = f"{df['Date'].min()} - {df['Date'].max()}"
+            if 'Date' in table.column_names:
+                date_minmax = pc.min_max(table['Date']).as_py()
+                date_range = f"{date_minmax['min']} - {date_minmax['max']}"
             else:
                 date_range = "No Date column"
             
             file_stats.append({
-                'file': os.path.basename(file_path),
-                'rows': len(df),
+                'file': filename,
+                'rows': table.num_rows,
                 'date_range': date_range
             })
             
-            print(f"   ✅ Loaded {len(df)} rows")
+            logger.debug(f"   ✅ Loaded {table.num_rows} rows")
             
         except Exception as e:
-            print(f"❌ Error reading {os.path.basename(file_path)}: {e}")
+            logger.error(f"❌ Error reading {filename}: {e}")
             continue
     
-    if not dataframes:
-        print("❌ No valid highlights CSV files could be loaded!")
+    if not tables:
+        logger.error("❌ No valid highlights CSV files could be loaded!")
         return
     
-    print()
-    
-    # Step 3: Concatenate all dataframes (preserving row order within each file)
-    print("🔗 Concatenating all highlights...")
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    print(f"   ✅ Combined dataset has {len(combined_df)} total rows")
-    
-    # Step 4: Sort by Date
-    if 'Date' in combined_df.columns:
-        print("📅 Sorting by Date...")
-        # Convert to numeric for proper sorting (in case it's stored as string)
-        combined_df['Date'] = pd.to_numeric(combined_df['Date'], errors='coerce')
-        combined_df = combined_df.sort_values('Date')
-        combined_df = combined_df.reset_index(drop=True)
-        print(f"   ✅ Sorted by date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
+    logger.info("")
+    
+    # Step 3: Concatenate all tables (preserving row order within each file)
+    logger.info("🔗 Concatenating all highlights...")
+    combined = pa.concat_tables(tables, promote_options="permissive")
+    
+    # Add source file information for tracking, as one dictionary-encoded column
+    file_index = np.repeat(np.arange(len(tables), dtype=np.int32), [table.num_rows for table in tables])
+    combined = combined.append_column('SOURCE_FILE', pa.DictionaryArray.from_arrays(file_index, source_files))
+    logger.info(f"   ✅ Combined dataset has {combined.num_rows} total rows")
+    
+    # Step 4: Sort by Date (stable, so row order within each date is kept)
+    if 'Date' in combined.column_names:
+        logger.info("📅 Sorting by Date...")
+        combined = combined.sort_by('Date')
+        date_minmax = pc.min_max(combined['Date']).as_py()
+        logger.info(f"   ✅ Sorted by date range: {date_minmax['min']} - {date_minmax['max']}")
     else:
-        print("⚠️  Date column not found - skipping date sorting")
+        logger.warning("⚠️  Date column not found - skipping date sorting")
     
     # Step 5: Save the combined file
     output_path = os.path.join(output_dir, output_file)
-    print(f"💾 Saving combined file to: {output_path}")
-    combined_df.to_csv(output_path, index=False)
+    logger.info(f"💾 Saving combined file to: {output_path}")
+    # Written through pandas to keep the file's format (unquoted header, 5.0 not 5)
+    combined.to_pandas().to_csv(output_path, index=False)
     
     # Step 6: Display summary statistics
-    print()
-    print("📊 Summary Statistics:")
-    print("=" * 40)
-    print(f"📁 Total files processed: {len(file_stats)}")
-    print(f"📊 Total rows combined: {len(combined_df)}")
+    logger.info("")
+    logger.info("📊 Summary Statistics:")
+    logger.info("=" * 40)
+    logger.info(f"📁 Total files processed: {len(file_stats)}")
+    logger.info(f"📊 Total rows combined: {combined.num_rows}")
     
-    if 'Date' in combined_df.columns:
-        print(f"📅 Date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
+    if 'Date' in combined.column_names:
+        logger.info(f"📅 Date range: {date_minmax['min']} - {date_minmax['max']}")
     
-    if 'PRODUCT_TYPE' in combined_df.columns:
-        print(f"🏷️  Product types: {sorted(combined_df['PRODUCT_TYPE'].unique())}")
+    if 'PRODUCT_TYPE' in combined.column_names:
+        logger.info(f"🏷️  Product types: {sorted(pc.unique(combined['PRODUCT_TYPE']).drop_null().to_pylist())}")
     
-    print()
-    print("📋 File-by-file breakdown:")
+    logger.info("")
+    logger.info("📋 File-by-file breakdown:")
     for stat in file_stats:
-        print(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
+        logger.info(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
     
-    print()
-    print("✅ Highlights concatenation completed successfully!")
+    logger.info("")
+    logger.info("✅ Highlights concatenation completed successfully!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     concatenate_highlights_correct() 
\ No newline at end of file
@@ -4,59 +4,70 @@ Fixed concatenation utility for highlights data from data/correct folder.
 Properly handles multi-line text and ensures Excel compatibility.
 """
 
+import logging
 import os
+import numpy as np
 import pandas as pd
 import glob
 import csv
+import sys
 
-def concatenate_highlights_fixed():
+logger = logging.getLogger(__name__)
+
+def concatenate_highlights_fixed(output_format="csv"):
     """
     Concatenate all highlights CSV files from data/correct into a single file, sorted by date.
     Fixed to handle multi-line text properly for Excel compatibility.
+    
+    Args:
+        output_format: "csv" (Excel compatible) or "parquet" (zstd compressed, for further processing)
     """
     # Use data/correct directory
     output_dir = "data/correct"
     output_file = "combined_all_highlights.csv"
     
-    print("🔄 Starting highlights CSV concatenation process from data/correct...")
-    print("=" * 60)
+    logger.info("🔄 Starting highlights CSV concatenation process from data/correct...")
+    logger.info("=" * 60)
     
     # Step 1: Discover highlights CSV files
     csv_pattern = os.path.join(output_dir, "highlights_*.csv")
     highlights_files = glob.glob(csv_pattern)
     
     if not highlights_files:
-        print("❌ No highlights CSV files found in data/correct directory!")
+        logger.error("❌ No highlights CSV files found in data/correct directory!")
         return
     
-    print(f"📁 Found {len(highlights_files)} highlights CSV files:")
-    for file in sorted(highlights_files):
-        print(f"  - {os.path.basename(file)}")
-    print()
+    logger.info(f"📁 Found {len(highlights_files)} highlights CSV files:")
+    files = sorted(highlights_files)
+    basenames = [os.path.basename(p) for p in files]
+    for name in basenames:
+        logger.debug(f"  - {name}")
+    logger.info("")
     
     # Step 2: Read and concatenate highlights CSV files
     dataframes = []
+    source_files = []
     file_stats = []
     
-    for file_path in sorted(highlights_files):
+    for file_path, filename in zip(files, basenames):
         try:
-            print(f"📖 Reading: {os.path.basename(file_path)}")
+            logger.debug(f"📖 Reading: {filename}")
             
             # Read CSV with proper handling of quoted fields
-            df = pd.read_csv(file_path, quoting=csv.QUOTE_ALL, keep_default_na=False)
+            # Date is kept as text here and converted once after concatenation
+            df = pd.read_csv(file_path, quoting=csv.QUOTE_ALL, keep_default_na=False, engine='c',
+                             dtype={'Date': str, 'PRODUCT_TYPE': 'category'})
             
             # Show the columns for the first file to understand structure
             if not dataframes:
-                print(f"   📋 Columns found: {list(df.columns)}")
+                logger.debug(f"   📋 Columns found: {list(df.columns)}")
             
             # Validate expected columns (flexible structure)
             if 'Date' not in df.columns:
-                print(f"⚠️  Warning: {os.path.basename(file_path)} missing 'Date' column: {list(df.columns)}")
-            
-            # Add source file information for tracking
-            df['SOURCE_FILE'] = os.path.basename(file_path)
+                logger.warning(f"⚠️  Warning: {filename} missing 'Date' column: {list(df.columns)}")
             
             dataframes.append(df)
+            source_files.append(filename)
             
             # Get date range info
             if 'Date' in df.columns:
@@ -64,84 +75,86 @@ def concatenate_highlights_fixed():
             else:
                 date_range = "No Date column"
             
+            rows = len(df)
             file_stats.append({
-                'file': os.path.basename(file_path),
-                'rows': len(df),
+                'file': filename,
+                'rows': rows,
                 'date_range': date_range
             })
             
-            print(f"   ✅ Loaded {len(df)} rows")
+            logger.debug(f"   ✅ Loaded {rows} rows")
             
         except Exception as e:
-            print(f"❌ Error reading {os.path.basename(file_path)}: {e}")
+            logger.error(f"❌ Error reading {filename}: {e}")
             continue
     
     if not dataframes:
-        print("❌ No valid highlights CSV files could be loaded!")
+        logger.error("❌ No valid highlights CSV files could be loaded!")
         return
     
-    print()
+    logger.info("")
     
     # Step 3: Concatenate all dataframes (preserving row order within each file)
-    print("🔗 Concatenating all highlights...")
+    logger.info("🔗 Concatenating all highlights...")
     combined_df = pd.concat(dataframes, ignore_index=True)
-    print(f"   ✅ Combined dataset has {len(combined_df)} total rows")
+    
+    # Add source file information for tracking, in one assignment on the combined frame
+    combined_df['SOURCE_FILE'] = np.repeat(source_files, [len(df) for df in dataframes])
+    
+    # The per-file frames have been copied into combined_df; release them before sorting and writing
+    dataframes.clear()
+    logger.info(f"   ✅ Combined dataset has {len(combined_df)} total rows")
     
     # Step 4: Sort by Date
     if 'Date' in combined_df.columns:
-        print("📅 Sorting by Date...")
+        logger.info("📅 Sorting by Date...")
         # Convert to numeric for proper sorting (in case it's stored as string)
         combined_df['Date'] = pd.to_numeric(combined_df['Date'], errors='coerce')
-        combined_df = combined_df.sort_values('Date')
-        combined_df = combined_df.reset_index(drop=True)
-        print(f"   ✅ Sorted by date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
+        # Stable argsort keeps row order within each date; take() reorders by position
+        order = np.argsort(combined_df['Date'].to_numpy(), kind='stable')
+        combined_df = combined_df.take(order).reset_index(drop=True)
+        date_min, date_max = combined_df['Date'].agg(['min', 'max'])
+        logger.info(f"   ✅ Sorted by date range: {date_min} - {date_max}")
     else:
-        print("⚠️  Date column not found - skipping date sorting")
+        logger.warning("⚠️  Date column not found - skipping date sorting")
     
-    # Step 5: Save the combined file with proper CSV formatting for Excel
+    # Step 5: Save the combined file
     output_path = os.path.join(output_dir, output_file)
-    print(f"💾 Saving combined file to: {output_path}")
-    
-    # Save with proper CSV formatting that Excel can handle
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        # Use csv.writer to ensure proper quoting and escaping
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-        
-        # Write header
-        writer.writerow(combined_df.columns.tolist())
-        
-        # Write data rows
-        for _, row in combined_df.iterrows():
-            # Convert all values to strings and handle None/NaN
-            row_data = []
-            for value in row:
-                if pd.isna(value) or value is None:
-                    row_data.append("")
-                else:
-                    row_data.append(str(value))
-            writer.writerow(row_data)
+    
+    if output_format == "parquet":
+        output_path = output_path.replace('.csv', '.parquet')
+        logger.info(f"💾 Saving combined file to: {output_path}")
+        combined_df.to_parquet(output_path, index=False, compression='zstd')
+    else:
+        # Save with proper CSV formatting that Excel can handle
+        logger.info(f"💾 Saving combined file to: {output_path}")
+        # QUOTE_ALL keeps multi-line text intact; missing values are written as ""
+        combined_df.to_csv(output_path, index=False, quoting=csv.QUOTE_ALL, na_rep='',
+                           encoding='utf-8', lineterminator='\r\n')
     
     # Step 6: Display summary statistics
-    print()
-    print("📊 Summary Statistics:")
-    print("=" * 40)
-    print(f"📁 Total files processed: {len(file_stats)}")
-    print(f"📊 Total rows combined: {len(combined_df)}")
+    logger.info("")
+    logger.info("📊 Summary Statistics:")
+    logger.info("=" * 40)
+    logger.info(f"📁 Total files processed: {len(file_stats)}")
+    logger.info(f"📊 Total rows combined: {len(combined_df)}")
     
     if 'Date' in combined_df.columns:
-        print(f"📅 Date range: {combined_df['Date'].min()} - {combined_df['Date'].max()}")
+        logger.info(f"📅 Date range: {date_min} - {date_max}")
     
     if 'PRODUCT_TYPE' in combined_df.columns:
-        print(f"🏷️  Product types: {sorted(combined_df['PRODUCT_TYPE'].unique())}")
+        logger.info(f"🏷️  Product types: {sorted(combined_df['PRODUCT_TYPE'].unique())}")
     
-    print()
-    print("📋 File-by-file breakdown:")
+    logger.info("")
+    logger.info("📋 File-by-file breakdown:")
     for stat in file_stats:
-        print(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
+        logger.info(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
     
-    print()
-    print("✅ Highlights concatenation completed successfully!")
-    print("💡 Note: File saved with proper CSV formatting for Excel compatibility")
+    logger.info("")
+    logger.info("✅ Highlights concatenation completed successfully!")
+    if output_format != "parquet":
+        logger.info("💡 Note: File saved with proper CSV formatting for Excel compatibility")
 
 if __name__ == "__main__":
-    concatenate_highlights_fixed() 
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    concatenate_highlights_fixed(sys.argv[1] if len(sys.argv) > 1 else "csv") 
\ No newline at end of file
@@ -5,11 +5,16 @@ Concatenates all table CSV files in the output directory, preserves row order wi
 and sorts all data by VALUATION_DATE for chronological analysis.
 """
 
+import logging
+import sys
 import os
+import numpy as np
 import pandas as pd
 import glob
 from src.utils.config_manager import ConfigManager
 
+logger = logging.getLogger(__name__)
+
 def concatenate_tables():
     """
     Concatenate all table CSV files into a single file, sorted by VALUATION_DATE.
@@ -19,8 +24,8 @@ def concatenate_tables():
     output_dir = config_manager.get_output_dir()
     output_file = "combined_all_tables.csv"
     
-    print("🔄 Starting CSV concatenation process...")
-    print("=" * 60)
+    logger.info("🔄 Starting CSV concatenation process...")
+    logger.info("=" * 60)
     
     # Step 1: Discover CSV files (exclude highlights)
     csv_pattern = os.path.join(output_dir, "*.csv")
@@ -33,94 +38,100 @@ def concatenate_tables():
                    "combined_" not in os.path.basename(f)]
     
     if not table_files:
-        print("❌ No table CSV files found in output directory!")
+        logger.error("❌ No table CSV files found in output directory!")
         return
     
-    print(f"📁 Found {len(table_files)} table CSV files:")
-    for file in sorted(table_files):
-        print(f"  - {os.path.basename(file)}")
-    print()
+    logger.info(f"📁 Found {len(table_files)} table CSV files:")
+    files = sorted(table_files)
+    basenames = [os.path.basename(p) for p in files]
+    for name in basenames:
+        logger.debug(f"  - {name}")
+    logger.info("")
     
     # Step 2: Read and concatenate CSV files
     dataframes = []
     file_stats = []
     
-    for file_path in sorted(table_files):
+    for file_path, filename in zip(files, basenames):
         try:
-            print(f"📖 Reading: {os.path.basename(file_path)}")
+            logger.debug(f"📖 Reading: {filename}")
             df = pd.read_csv(file_path)
             
             # Validate expected columns
             expected_columns = ['VALUATION_DATE', 'PRODUCT_TYPE', 'RISK_TYPE', 'GREEK_TYPE', 'RIDER_VALUE', 'ASSET_VALUE']
             if not all(col in df.columns for col in expected_columns):
-                print(f"⚠️  Warning: {os.path.basename(file_path)} has unexpected columns: {list(df.columns)}")
-                print(f"   Expected: {expected_columns}")
+                logger.warning(f"⚠️  Warning: {filename} has unexpected columns: {list(df.columns)}")
+                logger.warning(f"   Expected: {expected_columns}")
             
             # Add source file information for tracking
-            df['SOURCE_FILE'] = os.path.basename(file_path)
+            df['SOURCE_FILE'] = filename
             
             dataframes.append(df)
+            rows = len(df)
             file_stats.append({
-                'file': os.path.basename(file_path),
-                'rows': len(df),
+                'file': filename,
+                'rows': rows,
                 'date_range': f"{df['VALUATION_DATE'].min()} - {df['VALUATION_DATE'].max()}" if 'VALUATION_DATE' in df.columns else "N/A"
             })
             
-            print(f"   ✅ Loaded {len(df)} rows")
+            logger.debug(f"   ✅ Loaded {rows} rows")
             
         except Exception as e:
-            print(f"❌ Error reading {os.path.basename(file_path)}: {e}")
+            logger.error(f"❌ Error reading {filename}: {e}")
             continue
     
     if not dataframes:
-        print("❌ No valid CSV files could be loaded!")
+        logger.error("❌ No valid CSV files could be loaded!")
         return
     
-    print()
+    logger.info("")
     
     # Step 3: Concatenate all dataframes (preserving row order within each file)
-    print("🔗 Concatenating all tables...")
+    logger.info("🔗 Concatenating all tables...")
     combined_df = pd.concat(dataframes, ignore_index=True)
-    print(f"   ✅ Combined dataset has {len(combined_df)} total rows")
+    logger.info(f"   ✅ Combined dataset has {len(combined_df)} total rows")
     
     # Step 4: Sort by VALUATION_DATE
     if 'VALUATION_DATE' in combined_df.columns:
-        print("📅 Sorting by VALUATION_DATE...")
+        logger.info("📅 Sorting by VALUATION_DATE...")
         # Convert to numeric for proper sorting (in case it's stored as string)
         combined_df['VALUATION_DATE'] = pd.to_numeric(combined_df['VALUATION_DATE'], errors='coerce')
-        combined_df = combined_df.sort_values('VALUATION_DATE')
-        combined_df = combined_df.reset_index(drop=True)
-        print(f"   ✅ Sorted by date range: {combined_df['VALUATION_DATE'].min()} - {combined_df['VALUATION_DATE'].max()}")
+        # Stable argsort keeps row order within each date; take() reorders by position
+        order = np.argsort(combined_df['VALUATION_DATE'].to_numpy(), kind='stable')
+        combined_df = combined_df.take(order).reset_index(drop=True)
+        date_min, date_max = combined_df['VALUATION_DATE'].agg(['min', 'max'])
+        logger.info(f"   ✅ Sorted by date range: {date_min} - {date_max}")
     else:
-        print("⚠️  VALUATION_DATE column not found - skipping date sorting")
+        logger.warning("⚠️  VALUATION_DATE column not found - skipping date sorting")
     
     # Step 5: Save the combined file
     output_path = os.path.join(output_dir, output_file)
-    print(f"💾 Saving combined file to: {output_path}")
+    logger.info(f"💾 Saving combined file to: {output_path}")
     combined_df.to_csv(output_path, index=False)
     
     # Step 6: Display summary statistics
-    print()
-    print("📊 Summary Statistics:")
-    print("=" * 60)
-    print(f"Total files processed: {len(dataframes)}")
-    print(f"Total rows: {len(combined_df)}")
+    logger.info("")
+    logger.info("📊 Summary Statistics:")
+    logger.info("=" * 60)
+    logger.info(f"Total files processed: {len(dataframes)}")
+    logger.info(f"Total rows: {len(combined_df)}")
     
     if 'VALUATION_DATE' in combined_df.columns:
-        print(f"Date range: {combined_df['VALUATION_DATE'].min()} - {combined_df['VALUATION_DATE'].max()}")
-        print(f"Unique dates: {combined_df['VALUATION_DATE'].nunique()}")
+        logger.info(f"Date range: {date_min} - {date_max}")
+        logger.info(f"Unique dates: {combined_df['VALUATION_DATE'].nunique()}")
     
     if 'PRODUCT_TYPE' in combined_df.columns:
-        print(f"Product types: {', '.join(combined_df['PRODUCT_TYPE'].unique())}")
+        logger.info(f"Product types: {', '.join(combined_df['PRODUCT_TYPE'].unique())}")
     
-    print()
-    print("📋 File breakdown:")
+    logger.info("")
+    logger.info("📋 File breakdown:")
     for stat in file_stats:
-        print(f"  {stat['file']}: {stat['rows']} rows, dates {stat['date_range']}")
+        logger.info(f"  {stat['file']}: {stat['rows']} rows, dates {stat['date_range']}")
     
-    print()
-    print(f"✅ Successfully created: {output_path}")
-    print("🎉 Concatenation completed!")
+    logger.info("")
+    logger.info(f"✅ Successfully created: {output_path}")
+    logger.info("🎉 Concatenation completed!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     concatenate_tables() 
\ No newline at end of file
@@ -5,9 +5,50 @@ Concatenates all table CSV files in the data/correct directory, preserves row or
 and sorts all data by VALUATION_DATE for chronological analysis.
 """
 
+import logging
+import sys
 import os
-import pandas as pd
 import glob
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+logger = logging.getLogger(__name__)
+
+# Plain decimal or scientific numbers, as pd.to_numeric(errors='coerce') accepts them
+_NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+def _parse_numbers(values):
+    """Parse a text column as float64, turning non-numeric values into nulls"""
+    text = pc.utf8_trim_whitespace(values.cast(pa.string()))
+    return pc.if_else(pc.match_substring_regex(text, _NUMBER_PATTERN), text,
+                      pa.scalar(None, pa.string())).cast(pa.float64())
+
+def coerce_date_column(table, column):
+    """
+    Cast a date column to int64, turning non-numeric values into nulls
+    (the Arrow equivalent of pd.to_numeric(errors='coerce')).
+    """
+    values = table[column]
+    if pa.types.is_integer(values.type):
+        return table
+    if not pa.types.is_floating(values.type):
+        values = _parse_numbers(values)
+    # Dates written as floats (20240501.0) keep their integer value; NaN becomes null
+    values = pc.if_else(pc.is_nan(values), pa.scalar(None, pa.float64()), values)
+    numeric = values.cast(pa.int64(), safe=False)
+    return table.set_column(table.schema.get_field_index(column), column, numeric)
+
+def coerce_value_column(table, column):
+    """
+    Cast a value column read as text to float64, turning non-numeric values into nulls;
+    integer and float columns are left for concat_tables to promote.
+    """
+    values = table[column]
+    if pa.types.is_integer(values.type) or pa.types.is_floating(values.type):
+        return table
+    return table.set_column(table.schema.get_field_index(column), column, _parse_numbers(values))
 
 def concatenate_tables_correct():
     """
@@ -17,8 +58,8 @@ def concatenate_tables_correct():
     output_dir = "data/correct"
     output_file = "combined_all_tables.csv"
     
-    print("🔄 Starting CSV concatenation process from data/correct...")
-    print("=" * 60)
+    logger.info("🔄 Starting CSV concatenation process from data/correct...")
+    logger.info("=" * 60)
     
     # Step 1: Discover CSV files (exclude highlights)
     csv_pattern = os.path.join(output_dir, "*.csv")
@@ -32,92 +73,118 @@ def concatenate_tables_correct():
                    not os.path.basename(f).startswith("combined_all_")]
     
     if not table_files:
-        print("❌ No table CSV files found in data/correct directory!")
+        logger.error("❌ No table CSV files found in data/correct directory!")
         return
     
-    print(f"📁 Found {len(table_files)} table CSV files:")
-    for file in sorted(table_files):
-        print(f"  - {os.path.basename(file)}")
-    print()
+    logger.info(f"📁 Found {len(table_files)} table CSV files:")
+    files = sorted(table_files)
+    basenames = [os.path.basename(p) for p in files]
+    for name in basenames:
+        logger.debug(f"  - {name}")
+    logger.info("")
     
-    # Step 2: Read and concatenate CSV files
-    dataframes = []
+    # Step 2: Read CSV files into Arrow tables
+    tables = []
+    source_files = []
     file_stats = []
-    
-    for file_path in sorted(table_files):
+    read_options = pacsv.ReadOptions(block_size=8 << 20)
+    # Declare the label columns up front, dictionary encoded; dates and values are left to
+    # inference and coerced below, so a stray '20240501.0' or text cell does not reject the file
+    label_type = pa.dictionary(pa.int32(), pa.string())
+    convert_options = pacsv.ConvertOptions(column_types={
+        'PRODUCT_TYPE': label_type,
+        'RISK_TYPE': label_type,
+        'GREEK_TYPE': label_type
+    })
+    
+    for file_path, filename in zip(files, basenames):
         try:
-            print(f"📖 Reading: {os.path.basename(file_path)}")
-            df = pd.read_csv(file_path)
+            logger.debug(f"📖 Reading: {filename}")
+            table = pacsv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
             
             # Validate expected columns
             expected_columns = ['VALUATION_DATE', 'PRODUCT_TYPE', 'RISK_TYPE', 'GREEK_TYPE', 'RIDER_VALUE', 'ASSET_VALUE']
-            if not all(col in df.columns for col in expected_columns):
-                print(f"⚠️  Warning: {os.path.basename(file_path)} has unexpected columns: {list(df.columns)}")
-                print(f"   Expected: {expected_columns}")
+            if not all(col in table.column_names for col in expected_columns):
+                logger.warning(f"⚠️  Warning: {filename} has unexpected columns: {table.column_names}")
+                logger.warning(f"   Expected: {expected_columns}")
             
-            # Add source file information for tracking
-            df['SOURCE_FILE'] = os.path.basename(file_path)
+            # Convert to numeric for proper sorting (in case it's stored as string)
+            if 'VALUATION_DATE' in table.column_names:
+                table = coerce_date_column(table, 'VALUATION_DATE')
+            for column in ('RIDER_VALUE', 'ASSET_VALUE'):
+                if column in table.column_names:
+                    table = coerce_value_column(table, column)
             
-            dataframes.append(df)
+            tables.append(table)
+            source_files.append(filename)
+            if 'VALUATION_DATE' in table.column_names:
+                date_minmax = pc.min_max(table['VALUATION_DATE']).as_py()
+                date_range = f"{date_minmax['min']} - {date_minmax['max']}"
+            else:
+                date_range = "N/A"
             file_stats.append({
-                'file': os.path.basename(file_path),
-                'rows': len(df),
-                'date_range': f"{df['VALUATION_DATE'].min()} - {df['VALUATION_DATE'].max()}" if 'VALUATION_DATE' in df.columns else "N/A"
+                'file': filename,
+                'rows': table.num_rows,
+                'date_range': date_range
             })
             
-            print(f"   ✅ Loaded {len(df)} rows")
+            logger.debug(f"   ✅ Loaded {table.num_rows} rows")
             
         except Exception as e:
-            print(f"❌ Error reading {os.path.basename(file_path)}: {e}")
+            logger.error(f"❌ Error reading {filename}: {e}")
             continue
     
-    if not dataframes:
-        print("❌ No valid CSV files could be loaded!")
+    if not tables:
+        logger.error("❌ No valid CSV files could be loaded!")
         return
     
-    print()
-    
-    # Step 3: Concatenate all dataframes (preserving row order within each file)
-    print("🔗 Concatenating all tables...")
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    print(f"   ✅ Combined dataset has {len(combined_df)} total rows")
-    
-    # Step 4: Sort by VALUATION_DATE
-    if 'VALUATION_DATE' in combined_df.columns:
-        print("📅 Sorting by VALUATION_DATE...")
-        # Convert to numeric for proper sorting (in case it's stored as string)
-        combined_df['VALUATION_DATE'] = pd.to_numeric(combined_df['VALUATION_DATE'], errors='coerce')
-        combined_df = combined_df.sort_values('VALUATION_DATE')
-        combined_df = combined_df.reset_index(drop=True)
-        print(f"   ✅ Sorted by date range: {combined_df['VALUATION_DATE'].min()} - {combined_df['VALUATION_DATE'].max()}")
+    logger.info("")
+    
+    # Step 3: Concatenate all tables (preserving row order within each file)
+    logger.info("🔗 Concatenating all tables...")
+    combined = pa.concat_tables(tables, promote_options="permissive")
+    
+    # Add source file information for tracking, as one dictionary-encoded column
+    file_index = np.repeat(np.arange(len(tables), dtype=np.int32), [table.num_rows for table in tables])
+    combined = combined.append_column('SOURCE_FILE', pa.DictionaryArray.from_arrays(file_index, source_files))
+    logger.info(f"   ✅ Combined dataset has {combined.num_rows} total rows")
+    
+    # Step 4: Sort by VALUATION_DATE (stable, so row order within each date is kept)
+    if 'VALUATION_DATE' in combined.column_names:
+        logger.info("📅 Sorting by VALUATION_DATE...")
+        combined = combined.sort_by('VALUATION_DATE')
+        date_minmax = pc.min_max(combined['VALUATION_DATE']).as_py()
+        logger.info(f"   ✅ Sorted by date range: {date_minmax['min']} - {date_minmax['max']}")
     else:
-        print("⚠️  VALUATION_DATE column not found - skipping date sorting")
+        logger.warning("⚠️  VALUATION_DATE column not found - skipping date sorting")
     
     # Step 5: Save the combined file
     output_path = os.path.join(output_dir, output_file)
-    print(f"💾 Saving combined file to: {output_path}")
-    combined_df.to_csv(output_path, index=False)
+    logger.info(f"💾 Saving combined file to: {output_path}")
+    # Written through pandas to keep the file's format (unquoted header, 5.0 not 5)
+    combined.to_pandas().to_csv(output_path, index=False)
     
     # Step 6: Display summary statistics
-    print()
-    print("📊 Summary Statistics:")
-    print("=" * 40)
-    print(f"📁 Total files processed: {len(file_stats)}")
-    print(f"📊 Total rows combined: {len(combined_df)}")
+    logger.info("")
+    logger.info("📊 Summary Statistics:")
+    logger.info("=" * 40)
+    logger.info(f"📁 Total files processed: {len(file_stats)}")
+    logger.info(f"📊 Total rows combined: {combined.num_rows}")
     
-    if 'VALUATION_DATE' in combined_df.columns:
-        print(f"📅 Date range: {combined_df['VALUATION_DATE'].min()} - {combined_df['VALUATION_DATE'].max()}")
+    if 'VALUATION_DATE' in combined.column_names:
+        logger.info(f"📅 Date range: {date_minmax['min']} - {date_minmax['max']}")
     
-    if 'PRODUCT_TYPE' in combined_df.columns:
-        print(f"🏷️  Product types: {sorted(combined_df['PRODUCT_TYPE'].unique())}")
+    if 'PRODUCT_TYPE' in combined.column_names:
+        logger.info(f"🏷️  Product types: {sorted(pc.unique(combined['PRODUCT_TYPE']).drop_null().to_pylist())}")
     
-    print()
-    print("📋 File-by-file breakdown:")
+    logger.info("")
+    logger.info("📋 File-by-file breakdown:")
     for stat in file_stats:
-        print(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
+        logger.info(f"  - {stat['file']}: {stat['rows']} rows ({stat['date_range']})")
     
-    print()
-    print("✅ Tables concatenation completed successfully!")
+    logger.info("")
+    logger.info("✅ Tables concatenation completed successfully!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     concatenate_tables_correct() 
\ No newline at end of file
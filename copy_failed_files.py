@@ -8,6 +8,9 @@ import re
 import shutil
 from pathlib import Path
 
+# Date pattern in .msg filenames, compiled once for batch runs
+_DATE_RE = re.compile(r'(\d{4})_(\d{2})_(\d{2})')
+
 def parse_validation_log(log_path):
     """Parse the validation log to find failed files"""
     failed_files = []
@@ -31,7 +34,7 @@ def extract_date_and_product(filename):
     # Extract product: DBIB or WB
     
     # Extract date
-    date_match = re.search(r'(\d{4})_(\d{2})_(\d{2})', filename)
+    date_match = _DATE_RE.search(filename)
     if date_match:
         year, month, day = date_match.groups()
         date_str = f"{year}{month}{day}"
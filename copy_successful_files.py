@@ -3,26 +3,32 @@
 Script to copy successful files based on validation log
 """
 
+import logging
+import mmap
+import sys
 import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Patterns compiled once for batch runs; the log pattern scans raw bytes
+_CORRECT_RE = re.compile(rb'\] ([^\r\n]+\.msg) \| correct')
+_DATE_RE = re.compile(r'(\d{4})_(\d{2})_(\d{2})')
+
 def parse_validation_log(log_path):
-    """Parse the validation log to find successful files"""
-    successful_files = []
-    
-    with open(log_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line and '| correct' in line:
-                # Extract filename from line like: [timestamp] filename.msg | correct
-                match = re.search(r'\] (.+\.msg) \| correct', line)
-                if match:
-                    filename = match.group(1)
-                    successful_files.append(filename)
-    
-    return successful_files
+    """Parse the validation log and yield the successful files"""
+    # mmap cannot map an empty file
+    if os.path.getsize(log_path) == 0:
+        return
+    
+    # Scan the mapped bytes instead of reading the log into memory; matches never cross a line break
+    # Extract filename from lines like: [timestamp] filename.msg | correct
+    with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for match in _CORRECT_RE.finditer(mm):
+            yield match.group(1).decode('utf-8')
 
 def extract_date_and_product(filename):
     """Extract date and product from filename"""
@@ -31,7 +37,7 @@ def extract_date_and_product(filename):
     # Extract product: DBIB or WB
     
     # Extract date
-    date_match = re.search(r'(\d{4})_(\d{2})_(\d{2})', filename)
+    date_match = _DATE_RE.search(filename)
     if date_match:
         year, month, day = date_match.groups()
         date_str = f"{year}{month}{day}"
@@ -48,28 +54,29 @@ def extract_date_and_product(filename):
     
     return date_str, product
 
-def find_output_files(output_dir, date_str, product):
+def build_output_index(output_dir):
+    """List the output directory once and map file names to their paths"""
+    return {name: os.path.join(output_dir, name) for name in os.listdir(output_dir)}
+
+def find_output_files(output_index, date_str, product):
     """Find the corresponding output files for a given date and product"""
     files_to_copy = []
     
     # Look for table file
     table_pattern = f"table_Daily Hedging P&L Summary for {product} {date_str[:4]}_{date_str[4:6]}_{date_str[6:8]}.csv"
-    table_path = os.path.join(output_dir, table_pattern)
-    if os.path.exists(table_path):
-        files_to_copy.append(table_path)
+    if table_pattern in output_index:
+        files_to_copy.append(output_index[table_pattern])
     
     # Look for highlights file
     highlights_pattern = f"highlights_{date_str}_{product}.csv"
-    highlights_path = os.path.join(output_dir, highlights_pattern)
-    if os.path.exists(highlights_path):
-        files_to_copy.append(highlights_path)
+    if highlights_pattern in output_index:
+        files_to_copy.append(output_index[highlights_pattern])
     
     # Also look for highlights files with suffixes (like _002, _003, etc.)
     for suffix in range(1, 10):
         highlights_pattern_suffix = f"highlights_{date_str}_{product}_{suffix:03d}.csv"
-        highlights_path_suffix = os.path.join(output_dir, highlights_pattern_suffix)
-        if os.path.exists(highlights_path_suffix):
-            files_to_copy.append(highlights_path_suffix)
+        if highlights_pattern_suffix in output_index:
+            files_to_copy.append(output_index[highlights_pattern_suffix])
             break  # Take the first one found
     
     return files_to_copy
@@ -86,52 +93,61 @@ def copy_successful_files():
     os.makedirs(correct_dir, exist_ok=True)
     
     # Parse validation log
-    print("Parsing validation log...")
-    successful_files = parse_validation_log(validation_log_path)
-    print(f"Found {len(successful_files)} successful files")
+    logger.info("Parsing validation log...")
+    successful_files = list(parse_validation_log(validation_log_path))
+    logger.info(f"Found {len(successful_files)} successful files")
+    
+    # Index the output directory once instead of probing for each candidate file
+    output_index = build_output_index(output_dir)
     
     # Process each successful file
     copied_count = 0
     skipped_count = 0
+    copy_jobs = []
     
     for filename in successful_files:
-        print(f"\nProcessing: {filename}")
+        logger.debug(f"\nProcessing: {filename}")
         
         # Extract date and product
         date_str, product = extract_date_and_product(filename)
         if not date_str or not product:
-            print(f"  Skipped: Could not extract date/product from {filename}")
+            logger.warning(f"  Skipped: Could not extract date/product from {filename}")
             skipped_count += 1
             continue
         
-        print(f"  Date: {date_str}, Product: {product}")
+        logger.debug(f"  Date: {date_str}, Product: {product}")
         
         # Find output files
-        output_files = find_output_files(output_dir, date_str, product)
+        output_files = find_output_files(output_index, date_str, product)
         
         if not output_files:
-            print(f"  Skipped: No output files found for {filename}")
+            logger.warning(f"  Skipped: No output files found for {filename}")
             skipped_count += 1
             continue
         
-        # Copy files
+        # Queue files for copying
         for file_path in output_files:
             filename_only = os.path.basename(file_path)
-            dest_path = os.path.join(correct_dir, filename_only)
-            
+            copy_jobs.append((file_path, os.path.join(correct_dir, filename_only)))
+    
+    # Copy files on a thread pool; shutil.copy2 releases the GIL while copying
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [(os.path.basename(src), executor.submit(shutil.copy2, src, dst)) for src, dst in copy_jobs]
+        for filename_only, future in futures:
             try:
-                shutil.copy2(file_path, dest_path)
-                print(f"  Copied: {filename_only}")
+                future.result()
+                logger.debug(f"  Copied: {filename_only}")
                 copied_count += 1
             except Exception as e:
-                print(f"  Error copying {filename_only}: {e}")
+                logger.error(f"  Error copying {filename_only}: {e}")
                 skipped_count += 1
     
-    print(f"\nSummary:")
-    print(f"  Total successful files: {len(successful_files)}")
-    print(f"  Files copied: {copied_count}")
-    print(f"  Files skipped: {skipped_count}")
-    print(f"  Output directory: {correct_dir}")
+    logger.info(f"\nSummary:")
+    logger.info(f"  Total successful files: {len(successful_files)}")
+    logger.info(f"  Files copied: {copied_count}")
+    logger.info(f"  Files skipped: {skipped_count}")
+    logger.info(f"  Output directory: {correct_dir}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     copy_successful_files() 
\ No newline at end of file
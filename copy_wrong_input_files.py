@@ -3,24 +3,44 @@
 Script to copy original input files that failed validation
 """
 
+import logging
+import mmap
 import os
 import re
-import shutil
+import sys
 from pathlib import Path
 
+from src.utils.file_manager import fast_copy
+
+logger = logging.getLogger(__name__)
+
+# Log line pattern, compiled once for batch runs
+_WRONG_RE = re.compile(rb'\] ([^\r\n]+\.msg) \| wrong')
+
+def _link_or_copy(src, dst):
+    """Hard-link dst to src when both are on the same volume, otherwise copy it"""
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        # Already linked by an earlier run; copying onto it would truncate the source
+        if os.path.samefile(src, dst):
+            return
+    except OSError:
+        # Different volume or no hard-link support
+        pass
+    fast_copy(src, dst)
+
 def parse_validation_log(log_path):
     """Parse the validation log to find failed files"""
-    failed_files = []
+    # mmap cannot map an empty file
+    if os.path.getsize(log_path) == 0:
+        return []
     
-    with open(log_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line and '| wrong' in line:
-                # Extract filename from line like: [timestamp] filename.msg | wrong
-                match = re.search(r'\] (.+\.msg) \| wrong', line)
-                if match:
-                    filename = match.group(1)
-                    failed_files.append(filename)
+    # One regex pass over the raw bytes; matches never cross a line break
+    # Extract filename from lines like: [timestamp] filename.msg | wrong
+    with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        failed_files = [match.group(1).decode('utf-8') for match in _WRONG_RE.finditer(mm)]
     
     return failed_files
 
@@ -36,42 +56,39 @@ def copy_wrong_input_files():
     os.makedirs(input_wrong_dir, exist_ok=True)
     
     # Parse validation log
-    print("Parsing validation log for failed files...")
+    logger.info("Parsing validation log for failed files...")
     failed_files = parse_validation_log(validation_log_path)
-    print(f"Found {len(failed_files)} failed files")
+    logger.info(f"Found {len(failed_files)} failed files")
     
     # Process each failed file
     copied_count = 0
     skipped_count = 0
     
     for filename in failed_files:
-        print(f"\nProcessing: {filename}")
+        logger.debug(f"\nProcessing: {filename}")
         
-        # Source file path
+        # Source and destination file paths
         source_path = os.path.join(input_dir, filename)
-        
-        # Check if source file exists
-        if not os.path.exists(source_path):
-            print(f"  Skipped: Source file not found: {filename}")
-            skipped_count += 1
-            continue
-        
-        # Destination file path
         dest_path = os.path.join(input_wrong_dir, filename)
         
+        # A missing source surfaces from the copy itself, saving a separate exists() round-trip
         try:
-            shutil.copy2(source_path, dest_path)
-            print(f"  Copied: {filename}")
+            _link_or_copy(source_path, dest_path)
+            logger.debug(f"  Copied: {filename}")
             copied_count += 1
+        except FileNotFoundError:
+            logger.warning(f"  Skipped: Source file not found: {filename}")
+            skipped_count += 1
         except Exception as e:
-            print(f"  Error copying {filename}: {e}")
+            logger.error(f"  Error copying {filename}: {e}")
             skipped_count += 1
     
-    print(f"\nSummary:")
-    print(f"  Total failed files: {len(failed_files)}")
-    print(f"  Files copied: {copied_count}")
-    print(f"  Files skipped: {skipped_count}")
-    print(f"  Output directory: {input_wrong_dir}")
+    logger.info(f"\nSummary:")
+    logger.info(f"  Total failed files: {len(failed_files)}")
+    logger.info(f"  Files copied: {copied_count}")
+    logger.info(f"  Files skipped: {skipped_count}")
+    logger.info(f"  Output directory: {input_wrong_dir}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     copy_wrong_input_files() 
\ No newline at end of file
@@ -4,15 +4,22 @@ Script to filter Daily Hedging P&L .msg files by keeping only the latest file
 for each product and date combination.
 """
 
+import json
 import os
 import re
-import shutil
-from datetime import datetime
+import struct
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import extract_msg
+import olefile
 import logging
 
+from src.utils.file_manager import fast_copy
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +31,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Files in a group modified further apart than this are ordered by mtime alone
+_MTIME_TIEBREAK_SECONDS = 60
+
+# PR_CLIENT_SUBMIT_TIME (PT_SYSTIME) in a .msg file's top-level property stream
+_PROPERTIES_STREAM = '__properties_version1.0'
+_PR_CLIENT_SUBMIT_TIME = 0x00390040
+_FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+def _read_client_submit_time(msg_file_path) -> Optional[datetime]:
+    """Read the submit time straight from a .msg property stream, or None if it is not there"""
+    with olefile.OleFileIO(str(msg_file_path)) as ole:
+        if not ole.exists(_PROPERTIES_STREAM):
+            return None
+        raw = ole.openstream(_PROPERTIES_STREAM).read()
+    
+    # The top-level stream has a 32-byte header followed by 16-byte entries:
+    # tag (4), flags (4), value (8); a PT_SYSTIME value is a FILETIME stored inline
+    for offset in range(32, len(raw) - 15, 16):
+        tag, = struct.unpack_from('<I', raw, offset)
+        if tag == _PR_CLIENT_SUBMIT_TIME:
+            filetime, = struct.unpack_from('<Q', raw, offset + 8)
+            return _FILETIME_EPOCH + timedelta(microseconds=filetime // 10)
+    return None
+
 class MSGFilter:
     def __init__(self, source_dir: str, target_dir: str):
         """
@@ -37,11 +68,56 @@ class MSGFilter:
         self.target_dir = Path(target_dir)
         self.target_dir.mkdir(parents=True, exist_ok=True)
         
-        # Pattern to match Daily Hedging P&L files
+        # Pattern to match Daily Hedging P&L files; matched against the lowercased
+        # name, which is cheaper than a case-insensitive pattern
         self.file_pattern = re.compile(
-            r'.*Daily Hedging P&L Summary for (WB|DBIB) (\d{4}_\d{2}_\d{2})\.msg$',
-            re.IGNORECASE
+            r'daily hedging p&l summary for (wb|dbib) (\d{4}_\d{2}_\d{2})\.msg$'
         )
+        
+        # Send times already read from .msg files, keyed by name, size and mtime
+        self.send_time_cache_path = self.target_dir / '.sendtime_cache.json'
+        self.send_time_cache = self.load_send_time_cache()
+        # Keys looked up during this run; older keys for the same files are dropped on save
+        self.used_cache_keys = set()
+    
+    def load_send_time_cache(self) -> Dict[str, str]:
+        """
+        Load the persisted send-time cache from the target directory.
+        
+        Returns:
+            Dictionary mapping "name|size|mtime_ns" keys to ISO send times
+        """
+        try:
+            with open(self.send_time_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable send-time cache {self.send_time_cache_path}: {e}")
+            return {}
+    
+    def save_send_time_cache(self, existing_names: Optional[Set[str]] = None) -> None:
+        """
+        Write the send-time cache back to the target directory, pruning stale entries.
+        
+        Args:
+            existing_names: Names of the .msg files still in the source directory;
+                entries for any other file are dropped. None keeps every file's entries
+        """
+        # A file whose size or mtime changed was looked up under a new key, so the
+        # entries it was cached under before can never be hit again
+        used_names = {key.rsplit('|', 2)[0] for key in self.used_cache_keys}
+        self.send_time_cache = {
+            key: send_time for key, send_time in self.send_time_cache.items()
+            if (existing_names is None or key.rsplit('|', 2)[0] in existing_names)
+            and (key in self.used_cache_keys or key.rsplit('|', 2)[0] not in used_names)
+        }
+        
+        try:
+            with open(self.send_time_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.send_time_cache, f)
+        except OSError as e:
+            logger.warning(f"Could not write send-time cache {self.send_time_cache_path}: {e}")
     
     def extract_date_and_product(self, filename: str) -> Tuple[str, str, str]:
         """
@@ -53,7 +129,7 @@ class MSGFilter:
         Returns:
             Tuple of (product, date, full_filename)
         """
-        match = self.file_pattern.match(filename)
+        match = self.file_pattern.search(filename.lower())
         if match:
             product = match.group(1).upper()
             date = match.group(2)
@@ -70,29 +146,50 @@ class MSGFilter:
         Returns:
             datetime object representing the send time
         """
+        stat = None
         try:
+            # Files unchanged since an earlier run reuse the send time read back then
+            stat = msg_file_path.stat()
+            cache_key = f"{msg_file_path.name}|{stat.st_size}|{stat.st_mtime_ns}"
+            self.used_cache_keys.add(cache_key)
+            if cache_key in self.send_time_cache:
+                return datetime.fromisoformat(self.send_time_cache[cache_key])
+            
+            # Read just the submit time property; the full message is only parsed when it is missing
+            try:
+                send_time = _read_client_submit_time(msg_file_path)
+            except (OSError, struct.error) as e:
+                logger.debug(f"Could not read submit time property from {msg_file_path.name}: {e}")
+                send_time = None
+            if send_time is not None:
+                self.send_time_cache[cache_key] = send_time.isoformat()
+                return send_time
+            
             with extract_msg.Message(msg_file_path) as msg:
                 # Try to get the send time from the message
                 if hasattr(msg, 'date') and msg.date:
+                    self.send_time_cache[cache_key] = msg.date.isoformat()
                     return msg.date
                 elif hasattr(msg, 'header') and msg.header:
                     # Try to extract from header
                     date_header = msg.header.get('date')
                     if date_header:
-                        # Parse the date string
+                        # Parse the RFC 2822 date string
                         try:
-                            return datetime.strptime(date_header, '%a, %d %b %Y %H:%M:%S %z')
-                        except ValueError:
+                            send_time = parsedate_to_datetime(date_header)
+                            self.send_time_cache[cache_key] = send_time.isoformat()
+                            return send_time
+                        except (TypeError, ValueError):
                             pass
                 
                 # If we can't get the send time, use file modification time
                 logger.warning(f"Could not extract send time from {msg_file_path.name}, using file modification time")
-                return datetime.fromtimestamp(msg_file_path.stat().st_mtime)
+                return datetime.fromtimestamp(stat.st_mtime)
                 
         except Exception as e:
             logger.error(f"Error reading {msg_file_path.name}: {e}")
-            # Fallback to file modification time
-            return datetime.fromtimestamp(msg_file_path.stat().st_mtime)
+            # Fallback to file modification time, reusing the stat taken on entry when it succeeded
+            return datetime.fromtimestamp((stat or msg_file_path.stat()).st_mtime)
     
     def group_files_by_product_and_date(self) -> Dict[str, Dict[str, List[Path]]]:
         """
@@ -101,22 +198,29 @@ class MSGFilter:
         Returns:
             Dictionary with structure: {product: {date: [file_paths]}}
         """
-        grouped_files = {}
+        grouped_files = defaultdict(lambda: defaultdict(list))
+        
+        with os.scandir(self.source_dir) as entries:
+            msg_entries = [entry for entry in entries
+                           if entry.is_file() and entry.name.lower().endswith(".msg")]
+        
+        # Per-file lines are only formatted when debug logging is on
+        log_each_file = logger.isEnabledFor(logging.DEBUG)
+        matched_count = 0
         
-        for file_path in self.source_dir.glob("*.msg"):
-            product, date, filename = self.extract_date_and_product(file_path.name)
+        for entry in msg_entries:
+            product, date, filename = self.extract_date_and_product(entry.name)
             
             if product and date:
-                if product not in grouped_files:
-                    grouped_files[product] = {}
-                
-                if date not in grouped_files[product]:
-                    grouped_files[product][date] = []
-                
-                grouped_files[product][date].append(file_path)
-                logger.info(f"Found file: {filename} - Product: {product}, Date: {date}")
+                grouped_files[product][date].append(Path(entry.path))
+                matched_count += 1
+                if log_each_file:
+                    logger.debug(f"Found file: {filename} - Product: {product}, Date: {date}")
             else:
-                logger.warning(f"Skipping file that doesn't match pattern: {file_path.name}")
+                logger.warning(f"Skipping file that doesn't match pattern: {entry.name}")
+        
+        group_count = sum(len(dates) for dates in grouped_files.values())
+        logger.info(f"Found {matched_count} matching files in {group_count} product/date groups")
         
         return grouped_files
     
@@ -132,27 +236,43 @@ class MSGFilter:
         """
         latest_files = []
         
+        # File mtimes settle groups whose files landed more than a minute apart; only the
+        # remaining groups need send times, read on a thread pool since opening each .msg
+        # is dominated by share round-trips
+        file_mtimes = {}
+        contested_paths = []
+        for dates in grouped_files.values():
+            for file_paths in dates.values():
+                if len(file_paths) > 1:
+                    mtimes = {file_path: file_path.stat().st_mtime for file_path in file_paths}
+                    if max(mtimes.values()) - min(mtimes.values()) > _MTIME_TIEBREAK_SECONDS:
+                        file_mtimes.update(mtimes)
+                    else:
+                        contested_paths.extend(file_paths)
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            send_times = dict(zip(contested_paths, executor.map(self.get_msg_send_time, contested_paths)))
+        
         for product, dates in grouped_files.items():
             for date, file_paths in dates.items():
                 if len(file_paths) == 1:
                     # Only one file for this product and date
                     latest_files.append(file_paths[0])
                     logger.info(f"Single file for {product} on {date}: {file_paths[0].name}")
-                else:
-                    # Multiple files, find the latest one
-                    latest_file = None
-                    latest_time = None
+                elif file_paths[0] in file_mtimes:
+                    # Multiple files far enough apart to pick by modification time
+                    latest_file = max(file_paths, key=file_mtimes.__getitem__)
+                    latest_time = datetime.fromtimestamp(file_mtimes[latest_file])
                     
-                    for file_path in file_paths:
-                        send_time = self.get_msg_send_time(file_path)
-                        
-                        if latest_time is None or send_time > latest_time:
-                            latest_time = send_time
-                            latest_file = file_path
+                    latest_files.append(latest_file)
+                    logger.info(f"Latest file for {product} on {date}: {latest_file.name} (modified at {latest_time})")
+                else:
+                    # Multiple files, find the latest one (first wins on ties)
+                    latest_file = max(file_paths, key=send_times.__getitem__)
+                    latest_time = send_times[latest_file]
                     
-                    if latest_file:
-                        latest_files.append(latest_file)
-                        logger.info(f"Latest file for {product} on {date}: {latest_file.name} (sent at {latest_time})")
+                    latest_files.append(latest_file)
+                    logger.info(f"Latest file for {product} on {date}: {latest_file.name} (sent at {latest_time})")
         
         return latest_files
     
@@ -168,7 +288,7 @@ class MSGFilter:
         for file_path in latest_files:
             try:
                 target_path = self.target_dir / file_path.name
-                shutil.copy2(file_path, target_path)
+                fast_copy(file_path, target_path)
                 logger.info(f"Copied: {file_path.name} to {target_path}")
                 copied_count += 1
             except Exception as e:
@@ -191,6 +311,10 @@ class MSGFilter:
         
         # Find the latest file for each group
         latest_files = self.find_latest_file_for_each_group(grouped_files)
+        self.save_send_time_cache({file_path.name
+                                   for dates in grouped_files.values()
+                                   for file_paths in dates.values()
+                                   for file_path in file_paths})
         
         # Copy the latest files to the target directory
         self.copy_latest_files(latest_files)
@@ -3,57 +3,73 @@
 Script to find all table files with VALUATION_DATE = 20240501
 """
 
-import pandas as pd
+import csv
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+def _read_first_row(file_path):
+    """Read the first row of a table file and return (first_date, product_type), None if it has no data, or the read error"""
+    try:
+        # Only the header and the first record are read; the rest of the file is never parsed
+        with open(file_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            first_row = next((row for row in reader if row), None)
+    except Exception as e:
+        return e
+    
+    # Check if VALUATION_DATE column exists and has any rows
+    if 'VALUATION_DATE' not in header or first_row is None:
+        return None
+    
+    values = dict(zip(header, first_row))
+    return values.get('VALUATION_DATE', ''), values.get('PRODUCT_TYPE', 'Unknown')
+
+def _count_rows(file_path):
+    """Count the data rows of a table file without parsing it"""
+    with open(file_path, 'rb') as f:
+        return sum(1 for line in f if line.strip()) - 1
+
 def find_files_with_date(target_date="20240501"):
     """Find all table files with VALUATION_DATE = target_date"""
     
     correct_folder = "data/correct"
-    table_files = []
     matching_files = []
     
     # Find all CSV files that look like table files
-    for file in os.listdir(correct_folder):
-        if file.endswith(".csv") and file.startswith("table_"):
-            table_files.append(os.path.join(correct_folder, file))
+    with os.scandir(correct_folder) as entries:
+        table_files = [entry.path for entry in entries
+                       if entry.is_file() and entry.name.endswith(".csv") and entry.name.startswith("table_")]
     
     print(f"🔍 Searching {len(table_files)} table files for VALUATION_DATE = {target_date}")
     print("=" * 80)
     
-    for file_path in sorted(table_files):
+    # Each file is parsed in a worker process; results come back in sorted order and
+    # matches are only listed once in the summary
+    files = sorted(table_files)
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_read_first_row, files, chunksize=8))
+    
+    for file_path, result in zip(files, results):
         filename = os.path.basename(file_path)
         
-        try:
-            # Read the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Check if VALUATION_DATE column exists
-            if 'VALUATION_DATE' not in df.columns:
-                continue
-            
-            # Check if any row has the target date
-            if len(df) > 0:
-                first_date = str(df.iloc[0]['VALUATION_DATE'])
-                
-                if first_date == target_date:
-                    matching_files.append({
-                        'filename': filename,
-                        'file_path': file_path,
-                        'product_type': df.iloc[0]['PRODUCT_TYPE'] if 'PRODUCT_TYPE' in df.columns else 'Unknown',
-                        'row_count': len(df)
-                    })
-                    print(f"✅ Found: {filename}")
-                    print(f"   📅 Date: {first_date}")
-                    print(f"   🏷️  Product: {df.iloc[0]['PRODUCT_TYPE'] if 'PRODUCT_TYPE' in df.columns else 'Unknown'}")
-                    print(f"   📊 Rows: {len(df)}")
-                    print()
-                    
-        except Exception as e:
-            print(f"❌ Error reading {filename}: {e}")
+        if isinstance(result, Exception):
+            print(f"❌ Error reading {filename}: {result}")
+            continue
+        
+        if result is None:
             continue
+        
+        first_date, product_type = result
+        if first_date == target_date:
+            matching_files.append({
+                'filename': filename,
+                'file_path': file_path,
+                'product_type': product_type,
+                'row_count': _count_rows(file_path)
+            })
     
     print("=" * 80)
     print(f"📊 Summary:")
@@ -69,6 +85,9 @@ def find_files_with_date(target_date="20240501"):
 
 def show_file_details(file_path):
     """Show detailed information about a specific file"""
+    # pandas is only needed here, so the scanning helpers stay light to import
+    import pandas as pd
+    
     try:
         df = pd.read_csv(file_path)
         filename = os.path.basename(file_path)
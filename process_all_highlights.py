@@ -3,62 +3,50 @@
 Script to add PRODUCT_TYPE column to all highlights CSV files in the correct folder
 """
 
-import pandas as pd
 import os
-import re
 from pathlib import Path
 
+from src.utils.highlights_csv import HIGHLIGHTS_RE, insert_product_type_column
+
 def add_product_type_column(file_path):
-    """Add PRODUCT_TYPE column to a highlights CSV file"""
+    """Add PRODUCT_TYPE column to a highlights CSV file; returns 'updated', 'skipped' or 'error'"""
     
     # Extract product type from filename
     filename = os.path.basename(file_path)
-    match = re.search(r'highlights_\d{8}_(WB|DBIB)\.csv', filename)
+    match = HIGHLIGHTS_RE.search(filename)
     if not match:
         print(f"Could not extract product type from filename: {filename}")
-        return False
+        return 'error'
     
     product_type = match.group(1)
     
-    # Read the CSV file
+    # Stream the rows into a temp file, then swap it in; a malformed record (an unclosed
+    # quote, extra fields) is reported and the file is left as it was
     try:
-        df = pd.read_csv(file_path)
-        
-        # Check if PRODUCT_TYPE column already exists
-        if 'PRODUCT_TYPE' in df.columns:
-            print(f"⏭️  {filename} already has PRODUCT_TYPE column, skipping...")
-            return True
-        
-        # Insert PRODUCT_TYPE column after Date column
-        if 'Date' in df.columns:
-            # Get the index of the Date column
-            date_idx = df.columns.get_loc('Date')
-            
-            # Insert PRODUCT_TYPE column right after Date
-            df.insert(date_idx + 1, 'PRODUCT_TYPE', product_type)
-            
-            # Save the modified file
-            df.to_csv(file_path, index=False)
-            print(f"✅ Added PRODUCT_TYPE column to {filename}")
-            return True
-        else:
-            print(f"❌ No 'Date' column found in {filename}")
-            return False
-            
+        status = insert_product_type_column(file_path, product_type)
     except Exception as e:
         print(f"❌ Error processing {filename}: {e}")
-        return False
+        return 'error'
+    
+    if status == 'skipped':
+        print(f"⏭️  {filename} already has PRODUCT_TYPE column, skipping...")
+        return 'skipped'
+    if status == 'no_date':
+        print(f"❌ No 'Date' column found in {filename}")
+        return 'error'
+    
+    print(f"✅ Added PRODUCT_TYPE column to {filename}")
+    return 'updated'
 
 def process_all_highlights():
     """Process all highlights files in the correct folder"""
     
     correct_folder = "data/correct"
-    highlights_files = []
     
     # Find all highlights files
-    for file in os.listdir(correct_folder):
-        if file.startswith("highlights_") and file.endswith(".csv"):
-            highlights_files.append(os.path.join(correct_folder, file))
+    with os.scandir(correct_folder) as entries:
+        highlights_files = [entry.path for entry in entries
+                            if entry.is_file() and entry.name.startswith("highlights_") and entry.name.endswith(".csv")]
     
     print(f"Found {len(highlights_files)} highlights files to process")
     print("=" * 50)
@@ -68,12 +56,11 @@ def process_all_highlights():
     error_count = 0
     
     for file_path in sorted(highlights_files):
-        result = add_product_type_column(file_path)
-        if result:
-            if 'already has PRODUCT_TYPE column' in str(result):
-                skip_count += 1
-            else:
-                success_count += 1
+        status = add_product_type_column(file_path)
+        if status == 'updated':
+            success_count += 1
+        elif status == 'skipped':
+            skip_count += 1
         else:
             error_count += 1
     
@@ -4,70 +4,101 @@ Script to add PRODUCT_TYPE column to all highlights CSV files in the correct fol
 Robust version that handles malformed CSV files
 """
 
+import csv
 import pandas as pd
 import os
-import re
 from pathlib import Path
 
-def clean_csv_content(file_path):
-    """Clean malformed CSV content before processing"""
+from src.utils.highlights_csv import HIGHLIGHTS_RE, insert_product_type_column
+
+def clean_csv_content(file_path, cleaned_path):
+    """Stream a malformed CSV into cleaned_path, closing an unclosed quote on the last line; returns False on failure"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Remove trailing newlines and whitespace
-        content = content.rstrip()
-        
-        # Fix unclosed quotes by adding closing quote if needed
-        lines = content.split('\n')
-        if len(lines) >= 2:
-            # Check if the last data line has unclosed quotes
-            last_data_line = lines[-1]
-            if last_data_line.count('"') % 2 == 1:  # Odd number of quotes
-                # Add closing quote
-                lines[-1] = last_data_line + '"'
-                content = '\n'.join(lines)
-        
-        return content
+        with open(file_path, 'r', encoding='utf-8') as fin, open(cleaned_path, 'w', encoding='utf-8') as fout:
+            # Lines after the last one with content are held back until a later line shows
+            # they are not trailing whitespace; the last content line itself is held for the repair
+            pending = []
+            last_data_line = None
+            earlier_lines = False
+            for line in fin:
+                if line.strip():
+                    if last_data_line is not None:
+                        fout.write(last_data_line)
+                        earlier_lines = True
+                    fout.writelines(pending)
+                    earlier_lines = earlier_lines or bool(pending)
+                    pending = []
+                    last_data_line = line
+                else:
+                    pending.append(line)
+            
+            # Remove trailing newlines and whitespace
+            if last_data_line is not None:
+                last_data_line = last_data_line.rstrip()
+                # Check if the last data line has unclosed quotes
+                if earlier_lines and last_data_line.count('"') % 2 == 1:  # Odd number of quotes
+                    # Add closing quote
+                    last_data_line += '"'
+                fout.write(last_data_line)
+        return True
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
-        return None
+        return False
 
 def add_product_type_column(file_path):
-    """Add PRODUCT_TYPE column to a highlights CSV file"""
+    """Add PRODUCT_TYPE column to a highlights CSV file; returns 'updated', 'skipped' or 'error'"""
     
     # Extract product type from filename
     filename = os.path.basename(file_path)
-    match = re.search(r'highlights_\d{8}_(WB|DBIB)\.csv', filename)
+    match = HIGHLIGHTS_RE.search(filename)
     if not match:
         print(f"Could not extract product type from filename: {filename}")
-        return False
+        return 'error'
     
     product_type = match.group(1)
     
+    # Stream the rows into a temp file, then swap it in; malformed records (an unclosed
+    # quote, extra fields) raise csv.Error and go to the pandas parse chain below
+    try:
+        status = insert_product_type_column(file_path, product_type)
+        if status == 'skipped':
+            print(f"⏭️  {filename} already has PRODUCT_TYPE column, skipping...")
+            return 'skipped'
+        if status == 'no_date':
+            print(f"❌ No 'Date' column found in {filename}")
+            return 'error'
+        print(f"✅ Added PRODUCT_TYPE column to {filename}")
+        return 'updated'
+    except csv.Error:
+        pass
+    except Exception as e:
+        print(f"❌ Error processing {filename}: {e}")
+        return 'error'
+    
     # Read the CSV file with robust parsing
     try:
-        # First try normal pandas reading
+        # First try normal pandas reading; only a tokenizing failure moves on to the slower retries
         try:
             df = pd.read_csv(file_path)
-        except:
+        except pd.errors.ParserError:
             # If that fails, try with different parameters
             try:
                 df = pd.read_csv(file_path, quoting=3)  # QUOTE_NONE
-            except:
-                # If that still fails, clean the content and try again
-                content = clean_csv_content(file_path)
-                if content:
-                    # Write cleaned content to a temporary string and read it
-                    import io
-                    df = pd.read_csv(io.StringIO(content))
-                else:
-                    raise Exception("Could not clean CSV content")
+            except pd.errors.ParserError:
+                # If that still fails, clean the content into a temp file and try again
+                cleaned_path = file_path + ".clean"
+                try:
+                    if not clean_csv_content(file_path, cleaned_path):
+                        raise Exception("Could not clean CSV content")
+                    df = pd.read_csv(cleaned_path)
+                finally:
+                    if os.path.exists(cleaned_path):
+                        os.remove(cleaned_path)
         
         # Check if PRODUCT_TYPE column already exists
         if 'PRODUCT_TYPE' in df.columns:
             print(f"⏭️  {filename} already has PRODUCT_TYPE column, skipping...")
-            return True
+            return 'skipped'
         
         # Insert PRODUCT_TYPE column after Date column
         if 'Date' in df.columns:
@@ -80,25 +111,24 @@ def add_product_type_column(file_path):
             # Save the modified file
             df.to_csv(file_path, index=False)
             print(f"✅ Added PRODUCT_TYPE column to {filename}")
-            return True
+            return 'updated'
         else:
             print(f"❌ No 'Date' column found in {filename}")
-            return False
+            return 'error'
             
     except Exception as e:
         print(f"❌ Error processing {filename}: {e}")
-        return False
+        return 'error'
 
 def process_all_highlights():
     """Process all highlights files in the correct folder"""
     
     correct_folder = "data/correct"
-    highlights_files = []
     
     # Find all highlights files
-    for file in os.listdir(correct_folder):
-        if file.startswith("highlights_") and file.endswith(".csv"):
-            highlights_files.append(os.path.join(correct_folder, file))
+    with os.scandir(correct_folder) as entries:
+        highlights_files = [entry.path for entry in entries
+                            if entry.is_file() and entry.name.startswith("highlights_") and entry.name.endswith(".csv")]
     
     print(f"Found {len(highlights_files)} highlights files to process")
     print("=" * 50)
@@ -108,12 +138,11 @@ def process_all_highlights():
     error_count = 0
     
     for file_path in sorted(highlights_files):
-        result = add_product_type_column(file_path)
-        if result:
-            if 'already has PRODUCT_TYPE column' in str(result):
-                skip_count += 1
-            else:
-                success_count += 1
+        status = add_product_type_column(file_path)
+        if status == 'updated':
+            success_count += 1
+        elif status == 'skipped':
+            skip_count += 1
         else:
             error_count += 1
     
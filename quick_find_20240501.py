@@ -3,8 +3,10 @@
 Quick script to find all table files with VALUATION_DATE = 20240501
 """
 
-import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+from find_20240501_files import _count_rows, _read_first_row
 
 def find_20240501_files():
     """Find all table files with VALUATION_DATE = 20240501"""
@@ -13,23 +15,20 @@ def find_20240501_files():
     matching_files = []
     
     # Find all CSV files that look like table files
-    for file in os.listdir(correct_folder):
-        if file.endswith(".csv") and file.startswith("table_"):
-            file_path = os.path.join(correct_folder, file)
-            
-            try:
-                df = pd.read_csv(file_path)
-                
-                # Check if VALUATION_DATE column exists and has the target value
-                if 'VALUATION_DATE' in df.columns and len(df) > 0:
-                    first_date = str(df.iloc[0]['VALUATION_DATE'])
-                    
-                    if first_date == "20240501":
-                        product_type = df.iloc[0]['PRODUCT_TYPE'] if 'PRODUCT_TYPE' in df.columns else 'Unknown'
-                        matching_files.append((file, product_type, len(df)))
-                        
-            except Exception as e:
+    with os.scandir(correct_folder) as entries:
+        table_files = [(entry.name, entry.path) for entry in entries
+                       if entry.is_file() and entry.name.endswith(".csv") and entry.name.startswith("table_")]
+    
+    # Each file is parsed in a worker process; unreadable files are skipped
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_read_first_row, [path for _, path in table_files], chunksize=8)
+        for (file, file_path), result in zip(table_files, results):
+            if result is None or isinstance(result, Exception):
                 continue
+            
+            first_date, product_type = result
+            if first_date == "20240501":
+                matching_files.append((file, product_type, _count_rows(file_path)))
     
     print(f"Found {len(matching_files)} table files with VALUATION_DATE = 20240501:")
     print("=" * 60)
@@ -1,19 +1,46 @@
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
-import pandas as pd
+import numpy as np
 import hashlib
 import time
 import os
+import threading
+import weakref
 from datetime import datetime
 
+# Rows encoded per digest update when hashing validation frames
+_HASH_CHUNK_ROWS = 4096
+
+def _format_float_rows(values):
+    """Format a float matrix as comma-joined '%.6f' rows, normalizing zeros (including -0.0) to 0.0"""
+    values = np.where(values == 0, 0.0, values)
+    combined = np.char.mod('%.6f', values[:, 0])
+    for col_idx in range(1, values.shape[1]):
+        combined = np.char.add(np.char.add(combined, ','), np.char.mod('%.6f', values[:, col_idx]))
+    return combined
+
+def _numeric_cells(frame):
+    """Float values of a frame and a mask of the cells holding numbers; text cells cannot be subtracted"""
+    values = frame.to_numpy()
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64), np.ones(values.shape, dtype=bool)
+    is_number = np.vectorize(lambda x: isinstance(x, (int, float, np.number)), otypes=[bool])(values)
+    return np.where(is_number, values, np.nan).astype(np.float64), is_number
+
 class ValidationNode:
-    def __init__(self, log_path="log/validation_log.txt"):
+    def __init__(self, log_path="log/validation_log.txt", keep_concat=False):
         self.log_path = log_path
+        # Keep the joined hash input strings in the result for debugging
+        self.keep_concat = keep_concat
         # Ensure the directory exists
         os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        # The log is opened on the first entry and kept open; entries are buffered until flush() or close()
+        self._log_lock = threading.Lock()
+        self._log_fh = None
+        self._log_finalizer = None
 
-    def hash_columns(self, df, columns):
+    def hash_columns(self, df, columns, keep_concat=False):
         # Format numbers consistently with 6 decimal places
         def format_value(x):
             if isinstance(x, (int, float)):
@@ -23,17 +50,77 @@ class ValidationNode:
                 return f"{x:.6f}"
             return str(x)
         
-        concat_str = df[columns].apply(lambda row: ','.join(format_value(x) for x in row), axis=1).str.cat(sep='|')
-        return hashlib.sha256(concat_str.encode('utf-8')).hexdigest(), concat_str
+        values = df[columns].to_numpy()
+        if values.dtype == np.float64:
+            # All-float rows: format whole columns at once
+            rows = _format_float_rows(values).tolist()
+        else:
+            # Integer, text or mixed columns keep the per-value formatting, walking plain object
+            # row lists rather than building a Series per row
+            rows = [','.join(format_value(x) for x in row) for row in df[columns].to_numpy(dtype=object).tolist()]
+        
+        # Feed the digest in chunks of rows instead of encoding one giant joined string
+        digest = hashlib.sha256()
+        for start in range(0, len(rows), _HASH_CHUNK_ROWS):
+            if start:
+                digest.update(b'|')
+            digest.update('|'.join(rows[start:start + _HASH_CHUNK_ROWS]).encode('utf-8'))
+        concat_str = '|'.join(rows) if keep_concat else None
+        return digest.hexdigest(), concat_str
+
+    def _fast_match(self, df1, cols1, df2, cols2):
+        """Compare numeric columns on the formatted rows hash_columns would hash; None when the columns are not numeric"""
+        rows = []
+        for df, cols in ((df1, cols1), (df2, cols2)):
+            values = df[cols].to_numpy()
+            if values.dtype.kind not in "biuf":
+                return None
+            # Integers format the same as their float value in hash_columns
+            rows.append(_format_float_rows(values.astype(np.float64)))
+        return bool(np.array_equal(rows[0], rows[1]))
+
+    def compare_frames(self, df1, df2):
+        """Match DI/Excel values against the LLM output, returning (match, hash1, hash2, concat1, concat2)"""
+        # Frames with different row counts can never hash equal, so skip formatting and hashing them
+        if len(df1) != len(df2):
+            print(f"[DEBUG] Row counts differ ({len(df1)} vs {len(df2)}), skipping hash comparison")
+            return False, None, None, None, None
+        match = self._fast_match(df1, ["Liability", "Asset"], df2, ["RIDER_VALUE", "ASSET_VALUE"])
+        if match is not None and not self.keep_concat:
+            return match, None, None, None, None
+        # Text columns, or debugging output requested: fall back to the SHA-256 of the formatted rows
+        hash1, concat1 = self.hash_columns(df1, ["Liability", "Asset"], self.keep_concat)
+        hash2, concat2 = self.hash_columns(df2, ["RIDER_VALUE", "ASSET_VALUE"], self.keep_concat)
+        return hash1 == hash2, hash1, hash2, concat1, concat2
 
     def log_validation_result(self, file_name, match):
         """Log process date/time, file name, and whether correct or wrong"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         status = "correct" if match else "wrong"
-        with open(self.log_path, 'a') as f:
-            f.write(f"[{timestamp}] {file_name} | {status}\n")
+        with self._log_lock:
+            if self._log_fh is None:
+                self._log_fh = open(self.log_path, 'a', buffering=8192)
+                # Closes the handle when the node is collected or at exit, without keeping the node alive
+                self._log_finalizer = weakref.finalize(self, self._log_fh.close)
+            self._log_fh.write(f"[{timestamp}] {file_name} | {status}\n")
+
+    def flush(self):
+        """Write buffered validation log entries to disk"""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.flush()
+
+    def close(self):
+        """Flush and close the validation log; a later entry opens it again"""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_finalizer()
+                self._log_fh = None
+                self._log_finalizer = None
 
     def __call__(self, state: dict) -> dict:
+        # pandas is only needed once a file is actually validated
+        import pandas as pd
         start_time = time.time()
         file_type = state.get("file_type", "unknown")
         file_name = os.path.basename(state.get("file_path", ""))
@@ -53,26 +140,25 @@ class ValidationNode:
                 print(f"[DEBUG] LLM output path: {llm_output_path}")
                 
                 # Read original Excel (WB+DBIB) and find the actual data columns
-                df1_wb = pd.read_excel(excel_path, sheet_name="WB")
-                df1_dbib = pd.read_excel(excel_path, sheet_name="DBIB")
-                
-                # Find the Liability and Asset columns (they should be in the header row)
-                # Look for the row that contains "Liability" and "Asset"
-                liability_col = None
-                asset_col = None
-                
-                for idx, row in df1_wb.iterrows():
-                    for col_idx, value in enumerate(row):
-                        if pd.notna(value):
-                            value_str = str(value).strip().lower()
-                            # Look for exact matches for column headers, not partial matches
-                            if liability_col is None and value_str == "liability":
-                                liability_col = col_idx
-                            elif asset_col is None and value_str == "asset":
-                                asset_col = col_idx
+                # Open the workbook once for both sheets; headers are located manually below
+                with pd.ExcelFile(excel_path) as xls:
+                    df1_wb = xls.parse("WB", header=None, dtype=object)
+                    
+                    # Find the Liability and Asset columns (they should be in the header row)
+                    # Normalize every cell once and take the first exact match of each header in row order
+                    cell_text = df1_wb.astype(str).apply(lambda s: s.str.strip().str.lower()).to_numpy()
+                    liability_pos = np.argwhere(cell_text == "liability")
+                    asset_pos = np.argwhere(cell_text == "asset")
+                    liability_col = int(liability_pos[0, 1]) if len(liability_pos) else None
+                    asset_col = int(asset_pos[0, 1]) if len(asset_pos) else None
+                    
+                    # DBIB shares the WB layout, and row labels that matter sit left of the values,
+                    # so only the columns up to Liability/Asset are kept
                     if liability_col is not None and asset_col is not None:
-                        break
-                
+                        last_col = max(liability_col, asset_col)
+                        df1_wb = df1_wb.iloc[:, :last_col + 1]
+                        df1_dbib = xls.parse("DBIB", header=None, dtype=object, usecols=list(range(last_col + 1)))
+                    
                 if liability_col is None or asset_col is None:
                     error = "Could not find Liability and Asset columns"
                     print(f"[DEBUG] {error}")
@@ -81,18 +167,13 @@ class ValidationNode:
                     return state
                 
                 # Extract the data rows (skip header rows)
-                data_start_row = None
-                for idx, row in df1_wb.iterrows():
-                    if pd.notna(row.iloc[liability_col]) and pd.notna(row.iloc[asset_col]):
-                        # Check if these are numeric values
-                        try:
-                            float(row.iloc[liability_col])
-                            float(row.iloc[asset_col])
-                            data_start_row = idx
-                            break
-                        except (ValueError, TypeError):
-                            continue
-                
+                # The first row below the Liability/Asset header where both values are numeric starts the data
+                header_row = max(int(liability_pos[0, 0]), int(asset_pos[0, 0]))
+                numeric_rows = ((pd.to_numeric(df1_wb.iloc[:, liability_col], errors='coerce').notna()
+                                 & pd.to_numeric(df1_wb.iloc[:, asset_col], errors='coerce').notna()).to_numpy()
+                                & (np.arange(len(df1_wb)) > header_row))
+                data_start_row = int(numeric_rows.argmax()) if numeric_rows.any() else None
+
                 if data_start_row is None:
                     error = "Could not find data rows"
                     print(f"[DEBUG] {error}")
@@ -100,52 +181,47 @@ class ValidationNode:
                     self.log_validation_result(file_name, False)
                     return state
                 
-                # Extract data from both sheets
-                excel_data = []
+                # Extract data from both sheets as whole columns, then keep the rows that pass every filter
+                liability_parts = []
+                asset_parts = []
                 for sheet_name, df in [("WB", df1_wb), ("DBIB", df1_dbib)]:
-                    for idx in range(data_start_row, len(df)):
-                        row = df.iloc[idx]
-                        
-                        # Skip rows that are empty or contain only NaN values
-                        if pd.isna(row.iloc[liability_col]) and pd.isna(row.iloc[asset_col]):
-                            continue
-                        
-                        # Get the row label (first non-empty column) to check for "Total" rows
-                        row_label = ""
-                        for col_idx in range(len(row)):
-                            if pd.notna(row.iloc[col_idx]) and str(row.iloc[col_idx]).strip():
-                                row_label = str(row.iloc[col_idx]).strip()
-                                break
-                        
-                        # Skip rows containing "Total" (unless it's "HY Total")
-                        if "Total" in row_label and "HY Total" not in row_label:
-                            continue
-                        
-                        try:
-                            liability_val = float(row.iloc[liability_col]) if pd.notna(row.iloc[liability_col]) else 0
-                            asset_val = float(row.iloc[asset_col]) if pd.notna(row.iloc[asset_col]) else 0
-                            
-                            # Round to 6 decimal places for consistency
-                            liability_val = round(liability_val, 6)
-                            asset_val = round(asset_val, 6)
-                            
-                            # Skip rows where both values are zero (likely empty/invalid rows)
-                            if liability_val == 0 and asset_val == 0 and not row_label:
-                                continue
-                                
-                            excel_data.append([liability_val, asset_val])
-                        except (ValueError, TypeError):
-                            continue
+                    rows = df.iloc[data_start_row:]
+                    
+                    # Row label (first non-empty cell) of every row, and which rows are "Total" rows
+                    label_text = rows.astype(str).apply(lambda s: s.str.strip())
+                    labels = label_text.where(rows.notna() & label_text.ne("")).bfill(axis=1).iloc[:, 0].fillna("").astype(str)
+                    # Skip rows containing "Total" (unless it's "HY Total")
+                    total_rows = (labels.str.contains("Total", regex=False)
+                                  & ~labels.str.contains("HY Total", regex=False)).to_numpy()
+                    
+                    liability_raw = rows.iloc[:, liability_col]
+                    asset_raw = rows.iloc[:, asset_col]
+                    liability_num = pd.to_numeric(liability_raw, errors='coerce')
+                    asset_num = pd.to_numeric(asset_raw, errors='coerce')
+                    
+                    # Skip rows that are empty, or where either value holds text that is not a number
+                    has_value = (liability_raw.notna() | asset_raw.notna()).to_numpy()
+                    parsed = ~((liability_num.isna() & liability_raw.notna())
+                               | (asset_num.isna() & asset_raw.notna())).to_numpy()
+                    
+                    # Missing values count as 0; round to 6 decimal places for consistency
+                    liability_vals = np.round(liability_num.to_numpy(dtype=float, na_value=0.0), 6)
+                    asset_vals = np.round(asset_num.to_numpy(dtype=float, na_value=0.0), 6)
+                    
+                    # Skip rows where both values are zero (likely empty/invalid rows)
+                    blank_zero = (liability_vals == 0) & (asset_vals == 0) & (labels.to_numpy() == "")
+                    
+                    keep = has_value & parsed & ~total_rows & ~blank_zero
+                    liability_parts.append(liability_vals[keep])
+                    asset_parts.append(asset_vals[keep])
                 
-                df1 = pd.DataFrame(excel_data, columns=["Liability", "Asset"])
+                df1 = pd.DataFrame({"Liability": np.concatenate(liability_parts), "Asset": np.concatenate(asset_parts)})
                 
                 # Read LLM output
                 df2 = pd.read_csv(llm_output_path)
                 
-                # Extract and hash
-                hash1, concat1 = self.hash_columns(df1, ["Liability", "Asset"])
-                hash2, concat2 = self.hash_columns(df2, ["RIDER_VALUE", "ASSET_VALUE"])
-                match = (hash1 == hash2)
+                # Compare the extracted values with the LLM output
+                match, hash1, hash2, concat1, concat2 = self.compare_frames(df1, df2)
             elif file_type == "msg":
                 # MSG: compare after Document Intelligence and LLM output table
                 docint_df = state.get("msg_outputs", {}).get("docint_df")
@@ -168,33 +244,35 @@ class ValidationNode:
                         
                         # Compare the actual values between Document Intelligence and LLM output
                         min_rows = min(len(df1), len(df2))
-                        matching_rows = 0
-                        total_comparisons = 0
                         
                         print(f"[DEBUG] Comparing {min_rows} rows for validation")
                         
-                        for i in range(min_rows):
-                            try:
-                                # Get values from both dataframes
-                                di_liability = df1.iloc[i]['Liability']
-                                di_asset = df1.iloc[i]['Asset']
-                                llm_rider = df2.iloc[i]['RIDER_VALUE']
-                                llm_asset = df2.iloc[i]['ASSET_VALUE']
-                                
-                                # Compare values with tolerance for floating point differences
-                                liability_match = abs(di_liability - llm_rider) < 0.001
-                                asset_match = abs(di_asset - llm_asset) < 0.001
-                                
-                                if liability_match and asset_match:
-                                    matching_rows += 1
-                                else:
+                        # Compare whole columns at once with tolerance for floating point differences
+                        di_cols = df1[['Liability', 'Asset']].iloc[:min_rows]
+                        llm_cols = df2[['RIDER_VALUE', 'ASSET_VALUE']].iloc[:min_rows]
+                        di_values, di_numeric = _numeric_cells(di_cols)
+                        llm_values, llm_numeric = _numeric_cells(llm_cols)
+                        # Strictly within 0.001; NaN never matches
+                        match_mask = (np.abs(di_values - llm_values) < 0.001).all(axis=1)
+                        # Rows holding text (even numeric text) cannot be compared and are left out
+                        comparable = di_numeric.all(axis=1) & llm_numeric.all(axis=1)
+                        if min_rows and (match_mask & comparable).all():
+                            # Common case: every row agrees, so nothing needs reporting
+                            matching_rows = total_comparisons = min_rows
+                        else:
+                            for i in np.flatnonzero(~comparable):
+                                print(f"[DEBUG] Error comparing row {i}: non-numeric value")
+                            
+                            matching_rows = int((match_mask & comparable).sum())
+                            total_comparisons = int(comparable.sum())
+                            mismatched_rows = np.flatnonzero(comparable & ~match_mask)
+                            if len(mismatched_rows):
+                                # Plain tuples show the original cell values without building a Series per row
+                                di_rows = list(di_cols.itertuples(index=False, name=None))
+                                llm_rows = list(llm_cols.itertuples(index=False, name=None))
+                                for i in mismatched_rows:
+                                    (di_liability, di_asset), (llm_rider, llm_asset) = di_rows[i], llm_rows[i]
                                     print(f"[DEBUG] Row {i} mismatch: DI(L={di_liability}, A={di_asset}) vs LLM(R={llm_rider}, A={llm_asset})")
-                                
-                                total_comparisons += 1
-                                
-                            except Exception as e:
-                                print(f"[DEBUG] Error comparing row {i}: {e}")
-                                continue
                         
                         # Calculate match percentage
                         if total_comparisons > 0:
@@ -210,15 +288,11 @@ class ValidationNode:
                                 match = False
                         else:
                             print("[DEBUG] No valid comparisons made, falling back to hash comparison")
-                            hash1, concat1 = self.hash_columns(df1, ["Liability", "Asset"])
-                            hash2, concat2 = self.hash_columns(df2, ["RIDER_VALUE", "ASSET_VALUE"])
-                            match = (hash1 == hash2)
+                            match, hash1, hash2, concat1, concat2 = self.compare_frames(df1, df2)
                     else:
                         print(f"[DEBUG] Row count difference too large: {row_diff}")
                         # Fall back to exact comparison
-                        hash1, concat1 = self.hash_columns(df1, ["Liability", "Asset"])
-                        hash2, concat2 = self.hash_columns(df2, ["RIDER_VALUE", "ASSET_VALUE"])
-                        match = (hash1 == hash2)
+                        match, hash1, hash2, concat1, concat2 = self.compare_frames(df1, df2)
                 else:
                     error = "Missing Document Intelligence data or table output"
                     print(f"[DEBUG] {error}")
@@ -0,0 +1,64 @@
+"""
+Highlights CSV Module
+Handles the PRODUCT_TYPE column shared by the highlights processing scripts
+"""
+
+import csv
+import os
+import re
+
+# Filename pattern, compiled once for batch runs
+HIGHLIGHTS_RE = re.compile(r'highlights_\d{8}_(WB|DBIB)\.csv')
+
+
+def insert_product_type_column(file_path: str, product_type: str) -> str:
+    """
+    Insert PRODUCT_TYPE after Date by streaming rows into a temp file that replaces the original.
+    
+    Args:
+        file_path: Highlights CSV file to rewrite
+        product_type: Value written into every data row
+    
+    Returns:
+        'updated', 'skipped' when the column already exists, or 'no_date' when there is no Date column
+    
+    Raises:
+        csv.Error: A record is malformed (unclosed quote, or more fields than the header);
+            the original file is left untouched
+    """
+    tmp_path = file_path + ".tmp"
+    try:
+        with open(file_path, 'r', newline='', encoding='utf-8') as fin:
+            # strict: an unclosed quote raises instead of folding every following record into one field
+            reader = csv.reader(fin, strict=True)
+            header = next(reader, [])
+            
+            if 'PRODUCT_TYPE' in header:
+                return 'skipped'
+            
+            if 'Date' not in header:
+                return 'no_date'
+            
+            date_idx = header.index('Date')
+            width = len(header)
+            header.insert(date_idx + 1, 'PRODUCT_TYPE')
+            
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as fout:
+                writer = csv.writer(fout, lineterminator='\n')
+                writer.writerow(header)
+                for row in reader:
+                    # Blank lines carry no record
+                    if not row:
+                        continue
+                    if len(row) > width:
+                        raise csv.Error(f"Expected {width} fields in line {reader.line_num}, saw {len(row)}")
+                    # Short rows get empty trailing cells, as pandas pads them
+                    row.extend([''] * (width - len(row)))
+                    row.insert(date_idx + 1, product_type)
+                    writer.writerow(row)
+        
+        os.replace(tmp_path, file_path)
+        return 'updated'
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -3,19 +3,26 @@ LLM Client Module
 Handles all interactions with Azure OpenAI API for text and vision models
 """
 
-import toml
 import json
+import csv
+import functools
 import base64
-import pandas as pd
+import mmap
+import os
 from io import StringIO
-from openai import AzureOpenAI
-import re
+
+
+@functools.lru_cache(maxsize=4)
+def _load_secrets(secrets_file):
+    """Parse a secrets file once per path and share it across clients."""
+    import toml
+    return toml.load(secrets_file)
 
 
 class LLMClient:
     def __init__(self, secrets_file="config/secrets.toml"):
         """Initialize LLM client with Azure OpenAI configuration."""
-        self.secrets = toml.load(secrets_file)
+        self.secrets = _load_secrets(secrets_file)
         self.openai_config = self.secrets.get("openai", {})
         
         # Azure OpenAI configuration
@@ -31,11 +38,14 @@ class LLMClient:
             "system_prompt", 
             "You are a data analysis expert that helps transform and organize Excel data. Always return valid JSON arrays."
         )
+        # The system message never changes, so build it once for every request
+        self._system_msg = {"role": "system", "content": self.system_prompt}
         
         if not self.endpoint or not self.subscription_key:
             raise ValueError("Azure OpenAI endpoint or subscription key not found in secrets file")
         
-        # Initialize Azure OpenAI client
+        # Initialize Azure OpenAI client (imported here so loading this module stays cheap)
+        from openai import AzureOpenAI
         self.client = AzureOpenAI(
             azure_endpoint=self.endpoint,
             api_key=self.subscription_key,
@@ -56,7 +66,7 @@ class LLMClient:
             response = self.client.chat.completions.create(
                 model=self.deployment,  # Use deployment name for Azure
                 messages=[
-                    {"role": "system", "content": self.system_prompt},
+                    self._system_msg,
                     {"role": "user", "content": prompt}
                 ]
             )
@@ -84,10 +94,14 @@ class LLMClient:
             prompt = "Classify this picture: is it a blue table or a red table. Return blue or red. Don't return anything else."
         
         try:
-            # Read and encode image
+            # Encode the image straight from a memory map instead of reading it into a buffer first
             with open(image_path, "rb") as f:
-                image_bytes = f.read()
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
+                # An empty file cannot be mapped, and encodes to an empty image
+                if os.fstat(f.fileno()).st_size == 0:
+                    base64_image = ""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        base64_image = base64.b64encode(mm).decode('ascii')
             
             response = self.client.chat.completions.create(
                 model=self.deployment,  # Use deployment name for Azure
@@ -124,21 +138,30 @@ class LLMClient:
         Returns:
             Dictionary with 'table' key containing CSV string
         """
-        # Use robust JSON extraction method
-        json_match = re.search(r'(\[.*?\])', content, re.DOTALL)
+        # Decode exactly one JSON value starting at the first '[', so nested arrays parse correctly
+        json_start = content.find('[')
         
-        if json_match:
-            json_str = json_match.group(1)
+        if json_start >= 0:
             try:
-                data = json.loads(json_str)
+                data, _ = json.JSONDecoder().raw_decode(content, json_start)
                 if not isinstance(data, list):
                     print("LLM response is not a JSON array")
                     return {"table": ""}
                 
-                # Convert JSON array to CSV format
-                df = pd.DataFrame(data)
+                if not data:
+                    return {"table": ""}
+                
+                # Convert JSON array to CSV format; rows sharing one set of keys are written directly
                 csv_buffer = StringIO()
-                df.to_csv(csv_buffer, index=False)
+                first_row = data[0]
+                if isinstance(first_row, dict) and all(isinstance(row, dict) and row.keys() == first_row.keys() for row in data):
+                    writer = csv.DictWriter(csv_buffer, fieldnames=list(first_row), lineterminator='\n')
+                    writer.writeheader()
+                    writer.writerows(data)
+                else:
+                    # Mixed keys or non-object rows: let pandas align the columns
+                    import pandas as pd
+                    pd.DataFrame(data).to_csv(csv_buffer, index=False)
                 csv_string = csv_buffer.getvalue()
                 
                 return {"table": csv_string.strip()}
@@ -44,7 +44,8 @@ class DocumentProcessingWorkflow:
             llm_func=real_llm_func,
             output_dir=config_manager.get_output_dir()
         ))
-        self.graph.add_node("validate", ValidationNode())
+        self.validation_node = ValidationNode()
+        self.graph.add_node("validate", self.validation_node)
         
     def _setup_routing(self):
         """Setup workflow routing logic."""
@@ -122,6 +123,9 @@ class DocumentProcessingWorkflow:
             print(f"❌ Workflow error: {e}")
             self.logger.log_error(str(e), f"workflow processing file: {file_path}")
             raise
+        finally:
+            # Write this file's validation entry to disk
+            self.validation_node.flush()
     
     def _display_results(self, result: Dict[str, Any]):
         """
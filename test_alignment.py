@@ -9,11 +9,15 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+# Filename patterns, compiled once for batch runs
+_HIGHLIGHTS_RE = re.compile(r'highlights_(\d{8})_(WB|DBIB)\.csv')
+_TABLE_RE = re.compile(r'table_.*?(\d{4}_\d{2}_\d{2})\.csv')
+
 def extract_date_and_product_from_filename(filename):
     """Extract date and product type from filename"""
     
     # Pattern for highlights files: highlights_YYYYMMDD_PRODUCT.csv
-    highlights_match = re.search(r'highlights_(\d{8})_(WB|DBIB)\.csv', filename)
+    highlights_match = _HIGHLIGHTS_RE.search(filename)
     if highlights_match:
         date_str = highlights_match.group(1)
         product = highlights_match.group(2)
@@ -22,7 +26,7 @@ def extract_date_and_product_from_filename(filename):
         return date_formatted, product, "highlights"
     
     # Pattern for table files: table_*_YYYY_MM_DD.csv
-    table_match = re.search(r'table_.*?(\d{4}_\d{2}_\d{2})\.csv', filename)
+    table_match = _TABLE_RE.search(filename)
     if table_match:
         date_str = table_match.group(1)
         # Extract product type from the filename content
@@ -68,8 +72,9 @@ def test_file(file_path):
     print(f"   📄 File type: {file_type}")
     
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
+        # Read only the header and first row of the columns being checked
+        check_columns = ['Date', 'PRODUCT_TYPE'] if file_type == "highlights" else ['VALUATION_DATE', 'PRODUCT_TYPE']
+        df = pd.read_csv(file_path, nrows=1, usecols=lambda col: col in check_columns, dtype=str)
         
         if file_type == "highlights":
             # Check highlights file
@@ -82,8 +87,8 @@ def test_file(file_path):
                 return False
             
             # Get the actual values from the file
-            actual_date = str(df.iloc[0]['Date']) if len(df) > 0 else None
-            actual_product = df.iloc[0]['PRODUCT_TYPE'] if len(df) > 0 else None
+            actual_date = str(df.iloc[0]['Date']) if not df.empty else None
+            actual_product = df.iloc[0]['PRODUCT_TYPE'] if not df.empty else None
             
             print(f"   📅 Content date: {actual_date}")
             print(f"   🏷️  Content product: {actual_product}")
@@ -114,8 +119,8 @@ def test_file(file_path):
                 return False
             
             # Get the actual values from the file (check first row)
-            actual_date = str(df.iloc[0]['VALUATION_DATE']) if len(df) > 0 else None
-            actual_product = df.iloc[0]['PRODUCT_TYPE'] if len(df) > 0 else None
+            actual_date = str(df.iloc[0]['VALUATION_DATE']) if not df.empty else None
+            actual_product = df.iloc[0]['PRODUCT_TYPE'] if not df.empty else None
             
             print(f"   📅 Content date: {actual_date}")
             print(f"   🏷️  Content product: {actual_product}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the Date coercion and output format of the data/correct concatenation
+"""
+
+import os
+import sys
+import tempfile
+
+import pyarrow as pa
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from concat_highlights_correct import concatenate_highlights_correct
+from concat_tables_correct import coerce_date_column, coerce_value_column, concatenate_tables_correct
+
+def test_coerce_text_dates():
+    """Digits, float-formatted dates and padded values survive; text becomes null"""
+    table = pa.table({'Date': ['20240501', '20240502.0', ' 20240503 ', 'junk text', None, '2.0240504e7']})
+    result = coerce_date_column(table, 'Date')
+    assert result['Date'].type == pa.int64()
+    assert result['Date'].to_pylist() == [20240501, 20240502, 20240503, None, None, 20240504]
+
+def test_coerce_float_dates():
+    """A float Date column (nulls made it float) is cast back to integers"""
+    table = pa.table({'Date': pa.array([20240501.0, None, float('nan')], type=pa.float64())})
+    assert coerce_date_column(table, 'Date')['Date'].to_pylist() == [20240501, None, None]
+
+def test_coerce_integer_dates_untouched():
+    """Integer columns are returned as they are"""
+    table = pa.table({'Date': [20240501, 20240502]})
+    assert coerce_date_column(table, 'Date') is table
+
+def test_coerce_text_values():
+    """Text value columns become float64 with non-numbers as null; numeric columns are kept"""
+    table = pa.table({'RIDER_VALUE': ['1.5', 'N/A', ' ', '-2'], 'ASSET_VALUE': [1, 2, 3, 4]})
+    result = coerce_value_column(coerce_value_column(table, 'RIDER_VALUE'), 'ASSET_VALUE')
+    assert result['RIDER_VALUE'].to_pylist() == [1.5, None, None, -2.0]
+    assert result['ASSET_VALUE'].type == pa.int64()
+
+def test_combined_tables_keep_files_with_bad_cells():
+    """Float-formatted dates, N/A and blank cells are coerced instead of dropping the file"""
+    header = 'VALUATION_DATE,PRODUCT_TYPE,RISK_TYPE,GREEK_TYPE,RIDER_VALUE,ASSET_VALUE\n'
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'data', 'correct'))
+        with open(os.path.join(tmp, 'data', 'correct', 'table_WB_2024_05_01.csv'), 'w') as f:
+            f.write(header + '20240501,WB,Equity,Delta,1.0,2\n20240501.0,WB,Equity,Gamma,N/A,3\n')
+        with open(os.path.join(tmp, 'data', 'correct', 'table_WB_2024_04_30.csv'), 'w') as f:
+            f.write(header + '20240430,WB,Rates,Delta,0.5, \n')
+        try:
+            os.chdir(tmp)
+            concatenate_tables_correct()
+            with open(os.path.join('data', 'correct', 'combined_all_tables.csv')) as f:
+                lines = f.read().splitlines()
+        finally:
+            os.chdir(cwd)
+    assert lines == [
+        header.strip() + ',SOURCE_FILE',
+        '20240430,WB,Rates,Delta,0.5,,table_WB_2024_04_30.csv',
+        '20240501,WB,Equity,Delta,1.0,2.0,table_WB_2024_05_01.csv',
+        '20240501,WB,Equity,Gamma,,3.0,table_WB_2024_05_01.csv',
+    ]
+
+def test_combined_highlights_format():
+    """The combined file is sorted by Date and keeps pandas' CSV format"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'data', 'correct'))
+        with open(os.path.join(tmp, 'data', 'correct', 'highlights_20240502_WB.csv'), 'w') as f:
+            f.write('Date,PRODUCT_TYPE,Value\n20240502,WB,5.0\n')
+        with open(os.path.join(tmp, 'data', 'correct', 'highlights_20240501_WB.csv'), 'w') as f:
+            f.write('Date,PRODUCT_TYPE,Value\n20240501.0,WB,1.25\n')
+        try:
+            os.chdir(tmp)
+            concatenate_highlights_correct()
+            with open(os.path.join('data', 'correct', 'combined_all_highlights.csv')) as f:
+                lines = f.read().splitlines()
+        finally:
+            os.chdir(cwd)
+    assert lines == [
+        'Date,PRODUCT_TYPE,Value,SOURCE_FILE',
+        '20240501,WB,1.25,highlights_20240501_WB.csv',
+        '20240502,WB,5.0,highlights_20240502_WB.csv',
+    ]
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
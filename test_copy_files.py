@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the validation log parsing and file copy helpers
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import copy_successful_files
+import copy_wrong_input_files
+from src.utils.file_manager import fast_copy
+
+SAMPLE_LOG = (
+    "# validation_log.txt - Created 2024-05-01 09:00:00\n"
+    "[2024-05-01 09:00:01] Daily Hedging P&L Summary for WB 2024_05_01.msg | correct\n"
+    "[2024-05-01 09:00:02] Daily Hedging P&L Summary for DBIB 2024_05_01.msg | wrong\r\n"
+    "[2024-05-01 09:00:03] Daily Hedging P&L Summary for DBIB 2024_05_02.msg | correct\r\n"
+    "[2024-05-01 09:00:04] report.xlsx | correct\n"
+    "[2024-05-01 09:00:05] Daily Hedging P&L Summary for WB 2024_05_02.msg | wrong"
+)
+
+def _write_log(directory, content):
+    log_path = os.path.join(directory, "validation_log.txt")
+    with open(log_path, "w", encoding="utf-8", newline="") as f:
+        f.write(content)
+    return log_path
+
+def test_parse_successful_files():
+    """Only .msg lines marked correct are returned, without line endings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = _write_log(tmp, SAMPLE_LOG)
+        assert list(copy_successful_files.parse_validation_log(log_path)) == [
+            "Daily Hedging P&L Summary for WB 2024_05_01.msg",
+            "Daily Hedging P&L Summary for DBIB 2024_05_02.msg",
+        ]
+
+def test_parse_wrong_files():
+    """Only .msg lines marked wrong are returned, including a last line without newline"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = _write_log(tmp, SAMPLE_LOG)
+        assert copy_wrong_input_files.parse_validation_log(log_path) == [
+            "Daily Hedging P&L Summary for DBIB 2024_05_01.msg",
+            "Daily Hedging P&L Summary for WB 2024_05_02.msg",
+        ]
+
+def test_parse_empty_log():
+    """An empty log yields no files instead of failing to map"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = _write_log(tmp, "")
+        assert list(copy_successful_files.parse_validation_log(log_path)) == []
+        assert copy_wrong_input_files.parse_validation_log(log_path) == []
+
+def test_fast_copy_keeps_content_and_mtime():
+    """fast_copy reproduces the bytes and the modification time of the source"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src.msg")
+        dst = os.path.join(tmp, "dst.msg")
+        payload = os.urandom(300 * 1024)
+        with open(src, "wb") as f:
+            f.write(payload)
+        os.utime(src, (1714550400, 1714550400))
+        
+        fast_copy(src, dst)
+        
+        with open(dst, "rb") as f:
+            assert f.read() == payload
+        assert os.stat(dst).st_mtime == 1714550400
+
+def test_link_or_copy_is_idempotent():
+    """A second run on an existing link leaves the source intact"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src.msg")
+        dst = os.path.join(tmp, "dst.msg")
+        with open(src, "wb") as f:
+            f.write(b"payload")
+        
+        copy_wrong_input_files._link_or_copy(src, dst)
+        copy_wrong_input_files._link_or_copy(src, dst)
+        
+        with open(src, "rb") as f:
+            assert f.read() == b"payload"
+        with open(dst, "rb") as f:
+            assert f.read() == b"payload"
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the date/product fixes applied by check_and_align_dates
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from check_and_align_dates import check_and_fix_file
+
+def _fix(filename, content):
+    """Run check_and_fix_file on a temporary file and return (result, fixed lines)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, filename)
+        with open(file_path, 'w') as f:
+            f.write(content)
+        result = check_and_fix_file(file_path)
+        with open(file_path) as f:
+            return result, f.read().splitlines()
+
+def test_highlights_integer_date():
+    """A wrong integer Date is replaced in place and stays an integer"""
+    result, lines = _fix('highlights_20240501_WB.csv', 'Date,PRODUCT_TYPE,Value\n20240430,WB,5.0\n20240501,WB,1.0\n')
+    assert result
+    assert lines == ['Date,PRODUCT_TYPE,Value', '20240501,WB,5.0', '20240501,WB,1.0']
+
+def test_highlights_float_date():
+    """A Date column read as float64 (empty cells) accepts the fix"""
+    result, lines = _fix('highlights_20240501_DBIB.csv', 'Date,PRODUCT_TYPE,Value\n20240430,DBIB,5.0\n,DBIB,1.0\n')
+    assert result
+    assert lines == ['Date,PRODUCT_TYPE,Value', '20240501.0,DBIB,5.0', ',DBIB,1.0']
+
+def test_highlights_empty_product():
+    """An all-empty PRODUCT_TYPE column accepts the product from the filename"""
+    result, lines = _fix('highlights_20240501_WB.csv', 'Date,PRODUCT_TYPE,Value\n20240501,,5.0\n')
+    assert result
+    assert lines == ['Date,PRODUCT_TYPE,Value', '20240501,WB,5.0']
+
+def test_table_rows_aligned():
+    """Every table row gets the filename's date and product"""
+    result, lines = _fix('table_DBIB_2024_05_01.csv',
+                         'VALUATION_DATE,PRODUCT_TYPE,RIDER_VALUE\n20240430,WB,1.5\n20240430,WB,2.5\n')
+    assert result
+    assert lines == ['VALUATION_DATE,PRODUCT_TYPE,RIDER_VALUE', '20240501,DBIB,1.5', '20240501,DBIB,2.5']
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the PRODUCT_TYPE insertion in the highlights scripts
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import add_product_type_column as add_product_type_script
+import process_all_highlights
+from process_all_highlights_robust import add_product_type_column, clean_csv_content
+
+# Longer than csv.field_size_limit(), so csv.reader gives up and the pandas fallback runs
+BIG_FIELD = 'x' * 200000
+
+def _write_csv(directory, filename, content):
+    file_path = os.path.join(directory, filename)
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    return file_path
+
+def _read_lines(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        return f.read().replace(BIG_FIELD, 'BIG').splitlines()
+
+def test_streaming_path():
+    """Well-formed files get PRODUCT_TYPE right after Date and are skipped on a second run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240501_WB.csv',
+                               'Metric,Date,Value\nDelta,20240501,5.0\n\nGamma,20240501,"1,5"\n')
+        assert add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == [
+            'Metric,Date,PRODUCT_TYPE,Value',
+            'Delta,20240501,WB,5.0',
+            'Gamma,20240501,WB,"1,5"',
+        ]
+        assert add_product_type_column(file_path) == 'skipped'
+
+def test_pandas_fallback_keeps_csv_format():
+    """The fallback writes mixed-type columns without quoting the header or the strings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240501_DBIB.csv',
+                               f'Date,Metric,Value\n20240501,{BIG_FIELD},5.0\n20240501,Gamma,abc\n')
+        assert add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == [
+            'Date,PRODUCT_TYPE,Metric,Value',
+            '20240501,DBIB,BIG,5.0',
+            '20240501,DBIB,Gamma,abc',
+        ]
+
+def test_pandas_fallback_retries_without_quoting():
+    """An unclosed quote inside the file is read as a plain character"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240502_DBIB.csv',
+                               f'Date,Metric,Value\n20240502,"Delta,1\n20240502,{BIG_FIELD},2\n')
+        assert add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == [
+            'Date,PRODUCT_TYPE,Metric,Value',
+            '20240502,DBIB,"""Delta",1',
+            '20240502,DBIB,BIG,2',
+        ]
+
+def test_unclosed_quote_rows_not_merged():
+    """A mid-file unclosed quote goes to the pandas fallback instead of folding the rows into one field"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240502_WB.csv',
+                               'Date,Metric,Value\n20240502,"Delta,1\n20240502,Gamma,2\n20240502,Vega,3\n')
+        assert add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == [
+            'Date,PRODUCT_TYPE,Metric,Value',
+            '20240502,WB,"""Delta",1',
+            '20240502,WB,Gamma,2',
+            '20240502,WB,Vega,3',
+        ]
+
+def test_plain_script_leaves_malformed_file():
+    """The plain script reports unclosed quotes and extra fields without rewriting the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for content in ('Date,Metric,Value\n20240502,"Delta,1\n20240502,Gamma,2\n',
+                        'Date,Metric,Value\n20240502,Delta,1,extra\n20240502,Gamma,2\n'):
+            file_path = _write_csv(tmp, 'highlights_20240502_DBIB.csv', content)
+            assert process_all_highlights.add_product_type_column(file_path) == 'error'
+            assert _read_lines(file_path) == content.splitlines()
+            assert os.listdir(tmp) == ['highlights_20240502_DBIB.csv']
+
+def test_short_rows_padded():
+    """Rows missing trailing cells are padded before PRODUCT_TYPE is placed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240502_WB.csv', 'Metric,Value,Date\nDelta,1\n')
+        assert process_all_highlights.add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == ['Metric,Value,Date,PRODUCT_TYPE', 'Delta,1,,WB']
+
+def test_unclosed_last_quote_repaired():
+    """When the QUOTE_NONE read also fails, the last line's quote is closed and the file is read again"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240503_DBIB.csv',
+                               'Date,Metric,Value\n20240501,Alpha,0\n20240502,"Delta, x",1\n20240503,Gamma,"2\n\n')
+        assert add_product_type_column(file_path) == 'updated'
+        assert _read_lines(file_path) == [
+            'Date,PRODUCT_TYPE,Metric,Value',
+            '20240501,DBIB,Alpha,0',
+            '20240502,DBIB,"Delta, x",1',
+            '20240503,DBIB,Gamma,2',
+        ]
+        assert os.listdir(tmp) == ['highlights_20240503_DBIB.csv']
+
+def test_clean_csv_content_streams_lines():
+    """Inner blank lines are kept, trailing whitespace is dropped and only the last line is repaired"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'in.csv', 'Date,Metric\n"a\n\n20240501,"b  \n \n\n')
+        cleaned_path = os.path.join(tmp, 'out.csv')
+        assert clean_csv_content(file_path, cleaned_path)
+        with open(cleaned_path, encoding='utf-8') as f:
+            assert f.read() == 'Date,Metric\n"a\n\n20240501,"b"'
+
+def test_batch_script_skips_blank_lines():
+    """Blank lines do not become fake product-only records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240502_WB.csv',
+                               'Date,Metric,Value\n20240502,Delta,1\n\n20240502,Gamma,2\n')
+        assert add_product_type_script.insert_product_type(file_path) == (file_path, 'updated', 'WB')
+        assert _read_lines(file_path) == ['Date,PRODUCT_TYPE,Metric,Value', '20240502,WB,Delta,1', '20240502,WB,Gamma,2']
+
+def test_batch_script_leaves_malformed_file():
+    """An unclosed quote is reported as an error and the file is not rewritten"""
+    with tempfile.TemporaryDirectory() as tmp:
+        content = 'Date,Metric,Value\n20240502,"Delta,1\n20240502,Gamma,2\n'
+        file_path = _write_csv(tmp, 'highlights_20240502_DBIB.csv', content)
+        assert add_product_type_script.insert_product_type(file_path)[1] == 'error'
+        assert _read_lines(file_path) == content.splitlines()
+        assert os.listdir(tmp) == ['highlights_20240502_DBIB.csv']
+
+def test_missing_date_column():
+    """Files without a Date column are reported as errors and left untouched"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = _write_csv(tmp, 'highlights_20240501_WB.csv', 'Metric,Value\nDelta,5.0\n')
+        assert add_product_type_column(file_path) == 'error'
+        assert _read_lines(file_path) == ['Metric,Value', 'Delta,5.0']
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
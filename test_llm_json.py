@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for turning LLM responses into table CSV and sending vision requests
+"""
+
+import base64
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.llm_client import LLMClient
+
+def _extract(content):
+    # The extraction does not touch the Azure client, so no secrets are needed
+    return LLMClient.__new__(LLMClient)._extract_json_to_csv(content)["table"]
+
+def test_array_inside_prose():
+    """The array is found after leading text and trailing text is ignored"""
+    content = 'Here is the table:\n[{"RISK_TYPE": "Equity", "RIDER_VALUE": 1.5}]\nLet me know [if] needed.'
+    assert _extract(content) == "RISK_TYPE,RIDER_VALUE\nEquity,1.5"
+
+def test_nested_arrays():
+    """Arrays holding nested lists decode as one value"""
+    content = '[{"RISK_TYPE": "Equity", "TAGS": ["a", "b"]}]'
+    assert _extract(content) == "RISK_TYPE,TAGS\nEquity,\"['a', 'b']\""
+
+def test_uniform_rows_written_directly():
+    """Rows sharing one set of keys keep their order and values as written by the LLM"""
+    content = '[{"RISK_TYPE": "Equity", "RIDER_VALUE": 1}, {"RISK_TYPE": "Rates, IR", "RIDER_VALUE": 2.5}]'
+    assert _extract(content) == 'RISK_TYPE,RIDER_VALUE\nEquity,1\n"Rates, IR",2.5'
+
+def test_mixed_rows_aligned():
+    """Rows with different keys are aligned on the union of columns"""
+    content = '[{"RISK_TYPE": "Equity", "RIDER_VALUE": 1.5}, {"RISK_TYPE": "Rates", "ASSET_VALUE": 2.0}]'
+    assert _extract(content) == "RISK_TYPE,RIDER_VALUE,ASSET_VALUE\nEquity,1.5,\nRates,,2.0"
+
+def test_missing_or_invalid_array():
+    """Responses without a decodable array give an empty table"""
+    assert _extract("no table here") == ""
+    assert _extract("[{\"RISK_TYPE\": ") == ""
+    assert _extract("[]") == ""
+
+def _vision_url(image_bytes):
+    """Run process_vision on a file holding image_bytes and return the image URL it sent"""
+    requests = []
+    def create(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Blue "))])
+    
+    client = LLMClient.__new__(LLMClient)
+    client.deployment = "gpt-4o"
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "table.png")
+        with open(image_path, "wb") as f:
+            f.write(image_bytes)
+        assert client.process_vision(image_path) == "blue"
+    return requests[0]["messages"][0]["content"][1]["image_url"]["url"]
+
+def test_vision_image_encoded():
+    """The image bytes are sent base64-encoded as a PNG data URL"""
+    image_bytes = b"\x89PNG\r\n\x1a\n" + os.urandom(5000)
+    assert _vision_url(image_bytes) == "data:image/png;base64," + base64.b64encode(image_bytes).decode('ascii')
+
+def test_vision_empty_image_sent():
+    """An empty file is still sent, as an empty image"""
+    assert _vision_url(b"") == "data:image/png;base64,"
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
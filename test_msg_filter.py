@@ -4,12 +4,25 @@ Test script to verify the MSG filter functionality with sample files.
 """
 
 import os
+import struct
 import sys
+import tempfile
+import types
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# filter_msg_files imports extract_msg at module level; the tests below only reach it
+# through the extract_msg comparison, which is skipped when the package is missing
+try:
+    import extract_msg
+except ImportError:
+    extract_msg = None
+    sys.modules['extract_msg'] = types.ModuleType('extract_msg')
+
+import filter_msg_files
 from filter_msg_files import MSGFilter
 import logging
 
@@ -38,5 +51,166 @@ def test_with_temp_data():
     msg_filter = MSGFilter(source_directory, target_directory)
     msg_filter.run()
 
+SENT = datetime(2024, 5, 1, 18, 30, 15, tzinfo=timezone.utc)
+SECTOR = 512
+NO_STREAM = 0xFFFFFFFF
+END_OF_CHAIN = 0xFFFFFFFE
+
+def _dir_entry(name, entry_type, child, right, start, size):
+    raw_name = (name + '\0').encode('utf-16-le')
+    return (raw_name.ljust(64, b'\0') + struct.pack('<HBB', len(raw_name), entry_type, 1)
+            + struct.pack('<III', NO_STREAM, right, child) + b'\0' * 36
+            + struct.pack('<IQ', start, size))
+
+def _properties(sent):
+    """Top-level property stream holding PR_CLIENT_SUBMIT_TIME, padded past the mini-stream cutoff"""
+    filetime = (sent - datetime(1601, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1) * 10
+    body = b'\0' * 32 + struct.pack('<IIQ', 0x00390040, 0x6, filetime)
+    for i in range(253):
+        body += struct.pack('<IIQ', ((0x6600 + i) << 16) | 0x0003, 0x6, i)
+    return body
+
+def _write_msg(path, sent=SENT):
+    """Write a minimal compound file (FAT, directory, one property stream) as a .msg fixture"""
+    data = _properties(sent)
+    sectors = -(-len(data) // SECTOR)
+    fat = [0xFFFFFFFD, END_OF_CHAIN] + [2 + i + 1 for i in range(sectors - 1)] + [END_OF_CHAIN]
+    header = (bytes.fromhex('D0CF11E0A1B11AE1') + b'\0' * 16
+              + struct.pack('<HHHHH', 0x3E, 3, 0xFFFE, 9, 6) + b'\0' * 6
+              + struct.pack('<IIIIIIIIII', 0, 1, 1, 0, 4096, END_OF_CHAIN, 0, END_OF_CHAIN, 0, 0)
+              + b'\xff' * (109 * 4 - 4))
+    directory = (_dir_entry('Root Entry', 5, 1, NO_STREAM, END_OF_CHAIN, 0)
+                 + _dir_entry('__properties_version1.0', 2, NO_STREAM, NO_STREAM, 2, len(data)))
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(b''.join(struct.pack('<I', x) for x in fat).ljust(SECTOR, b'\xff'))
+        f.write(directory.ljust(SECTOR, b'\0'))
+        f.write(data.ljust(sectors * SECTOR, b'\0'))
+
+def test_submit_time_property_read():
+    """The submit time is read straight from the property stream"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Daily Hedging P&L Summary for WB 2024_05_01.msg"
+        _write_msg(path)
+        assert filter_msg_files._read_client_submit_time(path) == SENT
+
+def test_submit_time_matches_extract_msg():
+    """The property read agrees with the date extract_msg parses from the same file"""
+    if extract_msg is None:
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Daily Hedging P&L Summary for WB 2024_05_01.msg"
+        _write_msg(path)
+        with extract_msg.Message(str(path)) as msg:
+            assert msg.date == filter_msg_files._read_client_submit_time(path)
+
+def _count_property_reads(reads):
+    def read(msg_file_path):
+        reads.append(msg_file_path.name)
+        return SENT
+    return read
+
+def test_send_time_cache_hit_skips_parsing():
+    """A file with unchanged size and mtime is served from the persisted cache"""
+    original = filter_msg_files._read_client_submit_time
+    reads = []
+    filter_msg_files._read_client_submit_time = _count_property_reads(reads)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.msg"
+            path.write_bytes(b"payload")
+            
+            msg_filter = MSGFilter(tmp, os.path.join(tmp, "out"))
+            assert msg_filter.get_msg_send_time(path) == SENT
+            msg_filter.save_send_time_cache()
+            
+            reloaded = MSGFilter(tmp, os.path.join(tmp, "out"))
+            assert reloaded.get_msg_send_time(path) == SENT
+            assert reads == ["a.msg"]
+    finally:
+        filter_msg_files._read_client_submit_time = original
+
+def test_send_time_cache_misses_on_change():
+    """A changed size or mtime reads the file again"""
+    original = filter_msg_files._read_client_submit_time
+    reads = []
+    filter_msg_files._read_client_submit_time = _count_property_reads(reads)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.msg"
+            path.write_bytes(b"payload")
+            os.utime(path, (1714550400, 1714550400))
+            msg_filter = MSGFilter(tmp, os.path.join(tmp, "out"))
+            msg_filter.get_msg_send_time(path)
+            
+            path.write_bytes(b"longer payload")
+            os.utime(path, (1714550400, 1714550400))
+            msg_filter.get_msg_send_time(path)
+            
+            os.utime(path, (1714550460, 1714550460))
+            msg_filter.get_msg_send_time(path)
+            assert reads == ["a.msg"] * 3
+    finally:
+        filter_msg_files._read_client_submit_time = original
+
+def test_send_time_cache_prunes_stale_entries():
+    """Entries for deleted files and superseded versions of a file are not written back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "a.msg"
+        path.write_bytes(b"payload")
+        stat = path.stat()
+        current_key = f"a.msg|{stat.st_size}|{stat.st_mtime_ns}"
+        
+        msg_filter = MSGFilter(tmp, os.path.join(tmp, "out"))
+        msg_filter.send_time_cache = {
+            current_key: SENT.isoformat(),
+            "a.msg|1|1": SENT.isoformat(),
+            "b.msg|1|1": SENT.isoformat(),
+            "gone.msg|1|1": SENT.isoformat(),
+        }
+        msg_filter.get_msg_send_time(path)
+        msg_filter.save_send_time_cache({"a.msg", "b.msg"})
+        
+        assert MSGFilter(tmp, os.path.join(tmp, "out")).send_time_cache == {
+            current_key: SENT.isoformat(),
+            "b.msg|1|1": SENT.isoformat(),
+        }
+
+def _latest_with_spread(spread):
+    """Pick the latest of two files modified spread seconds apart, the older one sent last"""
+    with tempfile.TemporaryDirectory() as tmp:
+        older = Path(tmp) / "Daily Hedging P&L Summary for WB 2024_05_01.msg"
+        newer = Path(tmp) / "Daily Hedging P&L Summary for WB 2024_05_01 (1).msg"
+        older.write_bytes(b"older")
+        newer.write_bytes(b"newer")
+        os.utime(older, (1714550400, 1714550400))
+        os.utime(newer, (1714550400 + spread, 1714550400 + spread))
+        
+        msg_filter = MSGFilter(tmp, os.path.join(tmp, "out"))
+        read = []
+        send_times = {older.name: SENT + timedelta(hours=1), newer.name: SENT}
+        def get_msg_send_time(msg_file_path):
+            read.append(msg_file_path.name)
+            return send_times[msg_file_path.name]
+        msg_filter.get_msg_send_time = get_msg_send_time
+        
+        latest = msg_filter.find_latest_file_for_each_group({"WB": {"2024_05_01": [older, newer]}})
+        return [path.name for path in latest], sorted(read), older.name, newer.name
+
+def test_mtime_tiebreak_beyond_threshold():
+    """Files modified more than a minute apart are picked by mtime without reading them"""
+    latest, read, older, newer = _latest_with_spread(filter_msg_files._MTIME_TIEBREAK_SECONDS + 60)
+    assert latest == [newer]
+    assert read == []
+
+def test_send_time_within_threshold():
+    """Files modified within a minute of each other are picked by send time"""
+    latest, read, older, newer = _latest_with_spread(filter_msg_files._MTIME_TIEBREAK_SECONDS)
+    assert latest == [older]
+    assert read == sorted([older, newer])
+
 if __name__ == "__main__":
-    test_with_temp_data() 
\ No newline at end of file
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for the ValidationNode verdicts
+"""
+
+import gc
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.nodes.validation_node import ValidationNode
+
+def _frames(source_rows, llm_rows):
+    df1 = pd.DataFrame(source_rows, columns=["Liability", "Asset"])
+    df2 = pd.DataFrame(llm_rows, columns=["RIDER_VALUE", "ASSET_VALUE"])
+    return df1, df2
+
+def _verdicts(df1, df2):
+    """Verdicts of the default path and the keep_concat (SHA-256) path"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "log", "validation_log.txt")
+        fast = ValidationNode(log_path).compare_frames(df1, df2)[0]
+        full = ValidationNode(log_path, keep_concat=True).compare_frames(df1, df2)[0]
+    return fast, full
+
+def test_half_way_rounding_matches_hash():
+    """2.0000005 and 2.000001 both format as 2.000001, so every path matches"""
+    df1, df2 = _frames([[2.0000005, 1.0]], [[2.000001, 1.0]])
+    assert _verdicts(df1, df2) == (True, True)
+
+def test_zero_sign_and_integers():
+    """-0.0 matches 0.0 and integer columns match the same float values"""
+    df1, df2 = _frames([[-0.0, 5], [1, 2]], [[0.0, 5.0], [1.0, 2.0]])
+    assert _verdicts(df1, df2) == (True, True)
+
+def test_value_mismatch():
+    """A difference in the sixth decimal place is a mismatch on every path"""
+    df1, df2 = _frames([[2.000001, 1.0]], [[2.000002, 1.0]])
+    assert _verdicts(df1, df2) == (False, False)
+
+def test_text_columns_use_hash():
+    """Text values skip the numeric fast path and are compared by hash"""
+    df1, df2 = _frames([["n/a", 1.0]], [["n/a", 1.0]])
+    assert _verdicts(df1, df2) == (True, True)
+
+def test_log_opened_lazily_and_flushed():
+    """The log file is created by the first entry and readable after flush()"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "log", "validation_log.txt")
+        node = ValidationNode(log_path)
+        assert not os.path.exists(log_path)
+        
+        node.log_validation_result("a.msg", True)
+        node.flush()
+        with open(log_path) as f:
+            assert f.read().endswith("] a.msg | correct\n")
+        
+        # close() writes the rest out; a later entry opens the log again
+        node.log_validation_result("b.msg", False)
+        node.close()
+        node.log_validation_result("c.msg", True)
+        node.close()
+        with open(log_path) as f:
+            assert [line.split("] ")[1] for line in f.read().splitlines()] == [
+                "a.msg | correct", "b.msg | wrong", "c.msg | correct"]
+
+def test_log_closed_when_node_collected():
+    """A dropped node is collected and its buffered entries are written out"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "log", "validation_log.txt")
+        node = ValidationNode(log_path)
+        node.log_validation_result("a.msg", True)
+        log_fh = node._log_fh
+        del node
+        gc.collect()
+        assert log_fh.closed
+        with open(log_path) as f:
+            assert f.read().endswith("] a.msg | correct\n")
+
+def _validate_msg(source_rows, llm_csv):
+    """Run the MSG validation on Document Intelligence rows and an LLM table CSV; returns the match verdict"""
+    with tempfile.TemporaryDirectory() as tmp:
+        table_path = os.path.join(tmp, "table.csv")
+        with open(table_path, "w") as f:
+            f.write(llm_csv)
+        node = ValidationNode(os.path.join(tmp, "log", "validation_log.txt"))
+        state = node({
+            "file_type": "msg",
+            "file_path": "report.msg",
+            "msg_outputs": {
+                "docint_df": pd.DataFrame(source_rows, columns=["Liability", "Asset"]),
+                "table_output": table_path,
+            },
+        })
+        node.close()
+    return state["validation"].get("match")
+
+def test_msg_tolerance_is_strict():
+    """A difference of exactly 0.001 is a mismatch, anything smaller matches"""
+    assert _validate_msg([[0.001, 1.0]], "RIDER_VALUE,ASSET_VALUE\n0.0,1.0\n") is False
+    assert _validate_msg([[0.0009, 1.0]], "RIDER_VALUE,ASSET_VALUE\n0.0,1.0\n") is True
+
+def test_msg_eighty_percent_rule():
+    """Four of five matching rows pass, three of five fail"""
+    source = [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [4.0, 4.0], [5.0, 5.0]]
+    assert _validate_msg(source, "RIDER_VALUE,ASSET_VALUE\n1,1\n2,2\n3,3\n4,4\n9,9\n") is True
+    assert _validate_msg(source, "RIDER_VALUE,ASSET_VALUE\n1,1\n2,2\n3,3\n8,8\n9,9\n") is False
+
+def test_msg_text_rows_are_not_compared():
+    """Text cells (even numeric text) leave their rows out of the tolerance check"""
+    # The text column makes every LLM row text, so the exact hash decides: '1.5' differs from 1.500000
+    assert _validate_msg([[1.5, 1.0], [2.0, 2.0]], "RIDER_VALUE,ASSET_VALUE\n1.5,1.0\nabc,2.0\n") is False
+
+def _validate_excel(sheets, llm_csv):
+    """Run the Excel validation on a workbook built from {sheet: rows} and an LLM CSV; returns the validation dict"""
+    with tempfile.TemporaryDirectory() as tmp:
+        excel_path = os.path.join(tmp, "report.xlsx")
+        with pd.ExcelWriter(excel_path) as writer:
+            for sheet_name, rows in sheets.items():
+                pd.DataFrame(rows).to_excel(writer, sheet_name=sheet_name, header=False, index=False)
+        csv_path = os.path.join(tmp, "combined.csv")
+        with open(csv_path, "w") as f:
+            f.write(llm_csv)
+        node = ValidationNode(os.path.join(tmp, "log", "validation_log.txt"))
+        state = node({
+            "file_type": "xlsx",
+            "file_path": excel_path,
+            "excel_outputs": {"combined_output": csv_path},
+        })
+        node.close()
+    return state["validation"]
+
+EXCEL_SHEET = [
+    ["Daily Hedging P&L", None, None],
+    [None, "Liability", "Asset"],
+    ["Delta", 1.5, 2.0],
+    ["Gamma", -0.25, 0],
+    ["Total", 1.25, 2.0],
+    ["HY Total", 3, 4],
+    [None, None, None],
+]
+
+def test_excel_rows_extracted_and_matched():
+    """Total rows and empty rows are dropped, HY Total rows are kept, and WB rows come before DBIB"""
+    llm_csv = ("RIDER_VALUE,ASSET_VALUE\n"
+               "1.5,2.0\n-0.25,0.0\n3.0,4.0\n"
+               "1.5,2.0\n-0.25,0.0\n3.0,4.0\n")
+    assert _validate_excel({"WB": EXCEL_SHEET, "DBIB": EXCEL_SHEET}, llm_csv)["match"] is True
+    assert _validate_excel({"WB": EXCEL_SHEET, "DBIB": EXCEL_SHEET}, llm_csv.replace("-0.25", "-0.5", 1))["match"] is False
+
+def test_excel_numeric_rows_above_header_ignored():
+    """Numeric rows above the Liability/Asset header are not taken as data"""
+    sheet = [[1, 2, 3]] + EXCEL_SHEET
+    llm_csv = ("RIDER_VALUE,ASSET_VALUE\n"
+               "1.5,2.0\n-0.25,0.0\n3.0,4.0\n"
+               "1.5,2.0\n-0.25,0.0\n3.0,4.0\n")
+    assert _validate_excel({"WB": sheet, "DBIB": sheet}, llm_csv)["match"] is True
+
+def test_excel_missing_headers():
+    """Workbooks without Liability/Asset headers are reported as errors"""
+    sheet = [["Delta", 1.5, 2.0]]
+    validation = _validate_excel({"WB": sheet, "DBIB": sheet}, "RIDER_VALUE,ASSET_VALUE\n1.5,2.0\n")
+    assert validation == {"error": "Could not find Liability and Asset columns"}
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")